@@ -1,19 +1,80 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from prisma import Prisma
-from schema import schema
+from schema import document_cache, profiles, schema
+from swapi.data_access.base import Client
+from swapi.data_access.prisma_client import PrismaClient
+from swapi.data_access.sqlite_client import SQLiteClient
+from swapi.dataset import DATABASE_PATH, get_dataset_version
+from swapi.extensions.profiling import PROFILE_HEADER
+from swapi.loaders import get_row_loader
+from swapi.response_cache import ResponseCache, ResponseCacheMiddleware
+from swapi.snapshot import ensure_snapshot
+from swapi.store import Store
+
+from graphql import ExperimentalIncrementalExecutionResults
 
 from strawberry.fastapi import GraphQLRouter
 
 
-db = Prisma()
+# "prisma" queries the database through Prisma for each request, "sqlite"
+# queries it directly, "memory" loads the whole dataset at startup (through
+# Prisma) and serves requests from it, "snapshot" queries directly a read-only
+# copy of the database, indexed once and shared by all the workers
+DATA_SOURCE = os.environ.get("SWAPI_DATA_SOURCE", "prisma")
+# maximum number of cached responses, 0 disables the response cache
+RESPONSE_CACHE_SIZE = int(os.environ.get("SWAPI_RESPONSE_CACHE_SIZE", "1024"))
+# serve outdated responses while they are recomputed after a re-import
+RESPONSE_CACHE_SWR = os.environ.get("SWAPI_RESPONSE_CACHE_SWR") == "1"
+# connections to the database opened by the "sqlite" data source, it should
+# match the number of concurrent requests, see `hard_limit` in fly.toml
+SQLITE_POOL_SIZE = int(os.environ.get("SWAPI_SQLITE_POOL_SIZE", "25"))
+# don't check for changes to the database file, which is only written by
+# `cli import_data`, a restart is then needed to see them
+SQLITE_IMMUTABLE = os.environ.get("SWAPI_SQLITE_IMMUTABLE") == "1"
+
+db: Client = (
+    SQLiteClient(DATABASE_PATH, pool_size=SQLITE_POOL_SIZE, immutable=SQLITE_IMMUTABLE)
+    if DATA_SOURCE == "sqlite"
+    # the path is set at startup, once the snapshot is built
+    else (
+        SQLiteClient(DATABASE_PATH, pool_size=SQLITE_POOL_SIZE, immutable=True)
+        if DATA_SOURCE == "snapshot"
+        else PrismaClient()
+    )
+)
+
 app = FastAPI()
+store: Store | None = None
+# version of the data loaded at startup, for the data sources that don't see
+# later changes to the database
+served_version: str | None = None
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_SIZE,
+    stale_while_revalidate=RESPONSE_CACHE_SWR,
+)
 
 
 @app.on_event("startup")
 async def startup():
+    global store, served_version
+
+    if DATA_SOURCE == "snapshot":
+        assert isinstance(db, SQLiteClient)
+
+        # the workers build the snapshot one at a time, all but the first
+        # find it ready
+        db.path, served_version = await asyncio.to_thread(ensure_snapshot)
+
     await db.connect()
 
+    if DATA_SOURCE == "memory":
+        store = await Store.load(db)
+        served_version = store.version
+
 
 @app.on_event("shutdown")
 async def shutdown():
@@ -21,14 +82,81 @@ async def shutdown():
 
 
 async def get_context():
-    return {"db": db}
+    return {
+        "db": db,
+        "store": store,
+        "row_loader": get_row_loader(db, store),
+        "related_loaders": {},
+        "nodes": {},
+    }
+
+
+class SWAPIGraphQLRouter(GraphQLRouter):
+    """Refuses with a 406 the operations using @defer or @stream sent by
+    clients that don't accept multipart/mixed, as their results can only be
+    sent as multipart responses."""
 
+    async def execute_single(
+        self,
+        request: Request,
+        request_adapter: Any,
+        sub_response: Any,
+        context: Any,
+        root_value: Any,
+        request_data: Any,
+    ) -> Any:
+        result = await super().execute_single(
+            request=request,
+            request_adapter=request_adapter,
+            sub_response=sub_response,
+            context=context,
+            root_value=root_value,
+            request_data=request_data,
+        )
 
-graphql_app = GraphQLRouter(schema, context_getter=get_context)
+        if isinstance(
+            result, ExperimentalIncrementalExecutionResults
+        ) and "multipart/mixed" not in request_adapter.headers.get("accept", ""):
+            # stops the deferred and streamed fields still running
+            await result.subsequent_results.aclose()
+
+            raise HTTPException(
+                406, "Operations using @defer or @stream need multipart/mixed"
+            )
+
+        return result
+
+
+graphql_app = SWAPIGraphQLRouter(schema, context_getter=get_context)
 
 app.include_router(graphql_app, prefix="/graphql")
 
 
+def get_served_version() -> str:
+    return served_version or get_dataset_version()
+
+
+# always added, so that the cache can be enabled later on, like the
+# benchmarks do, it passes the requests through while it's disabled
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    get_version=get_served_version,
+    # profiled requests need to be executed to be profiled
+    bypass_headers={PROFILE_HEADER: "1"},
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "response_cache": response_cache.get_stats(),
+        "document_cache": document_cache.get_stats(),
+        "profiles": profiles.get_stats(),
+        "sqlite_pool": db.get_stats() if isinstance(db, SQLiteClient) else None,
+    }
+
+
 @app.get("/")
 async def root():
     return RedirectResponse(url="/graphql")
@@ -1,13 +1,19 @@
 import asyncio
+from pathlib import Path
+from typing import Optional
 
 import prisma
 import rich
+import rich.table
 import typer
 from jsondiff import diff
 
-from .constants import ALL_QUERIES, REFERENCE_API_URL
+from .benchmark import Benchmark, compare, load, save
+from .constants import ALL_QUERIES, BENCHMARK_QUERIES, REFERENCE_API_URL
+from .dumps import get_database_items, read_dump, write_dump
 from .importer import Importer
-from .utils.query import query
+from .microbenchmarks import compare as compare_microbenchmarks, get_microbenchmarks
+from .utils.query import QueryClient
 from .utils.wait_for_port import wait_for_port
 
 
@@ -15,16 +21,42 @@ app = typer.Typer()
 
 
 @app.command()
-def import_data():
+def import_data(
+    source: Optional[Path] = None,
+    incremental: bool = False,
+    recordings: Optional[Path] = None,
+    record: bool = False,
+):
+    """Imports the data of the reference API, or of the `source` dump written
+    by the `dump` command.
+
+    With `--incremental`, only the rows that were edited and the links that
+    changed are written, instead of replacing everything.
+
+    With `--recordings`, the responses of the reference API are read from
+    that directory, `--record` stores the missing ones there.
+    """
+
     async def _import():
+        items = read_dump(source) if source is not None else None
         db = prisma.Prisma()
 
         await db.connect()
 
-        importer = Importer(db)
-
         try:
-            await importer.import_all()
+            async with QueryClient(recordings=recordings, record=record) as client:
+                importer = Importer(db, client)
+
+                if incremental:
+                    changes = await importer.update_all(items)
+
+                    rich.print(
+                        f"{changes['created']} created, "
+                        f"{changes['updated']} updated, "
+                        f"{changes['deleted']} deleted"
+                    )
+                else:
+                    await importer.import_all(items)
         finally:
             await db.disconnect()
 
@@ -34,31 +66,165 @@ def import_data():
 
 
 @app.command()
-def test_queries():
-    async def _test():
-        if not await wait_for_port("localhost", 8000):
-            rich.print("The server is not running")
-            return
+def dump(output: Path):
+    """Writes the data in the database to `output`, in the format read by
+    `import-data --source`. Files ending in .ndjson or .jsonl get one item
+    per line, the others a single JSON object.
+    """
 
-        for query_path in ALL_QUERIES:
-            text = query_path.read_text()
+    rich.print("dumping data...")
+    write_dump(output, asyncio.run(get_database_items()))
+    rich.print(f"dumped data to {output}")
 
-            reference, implementation = await asyncio.gather(
-                query(REFERENCE_API_URL, text),
-                query("http://localhost:8000/graphql", text),
-            )
 
-            difference = diff(reference, implementation, syntax="symmetric")
+@app.command()
+def test_queries(
+    reference_url: str = REFERENCE_API_URL,
+    port: int = 8000,
+    recordings: Optional[Path] = None,
+    record: bool = False,
+):
+    """Compares the responses of the server running on `port` with the ones
+    of `reference_url`, for example another instance using a different
+    SWAPI_DATA_SOURCE.
+
+    With `--recordings`, the responses of `reference_url` are read from that
+    directory, `--record` stores the missing ones there.
+    """
+
+    async def _test(client: QueryClient, query_path: Path):
+        text = query_path.read_text()
+
+        reference, implementation = await asyncio.gather(
+            client.query(reference_url, text),
+            client.query(f"http://localhost:{port}/graphql", text),
+        )
+
+        difference = diff(reference, implementation, syntax="symmetric")
+
+        if difference:
+            print(f"Query {query_path} is different")
+            rich.print(difference)
+
+    async def _test_all():
+        if not await wait_for_port("localhost", port):
+            rich.print("The server is not running")
+            return
 
-            if difference:
-                print(f"Query {query_path} is different")
-                rich.print(difference)
+        async with QueryClient(recordings=recordings, record=record) as client:
+            await asyncio.gather(
+                *(_test(client, query_path) for query_path in ALL_QUERIES)
+            )
 
     rich.print("running queries...")
-    asyncio.run(_test())
+    asyncio.run(_test_all())
     rich.print("ran queries")
 
 
+@app.command()
+def benchmark(
+    iterations: int = typer.Option(50, min=2),
+    warmup: int = 5,
+    concurrency: int = 1,
+    response_cache: bool = False,
+    output: Optional[Path] = None,
+    baseline: Optional[Path] = None,
+    threshold: float = 0.2,
+):
+    """Runs all the queries against the app in process and reports their
+    latency, throughput, database round trips and peak memory.
+
+    With `--baseline`, exits with an error when a query is more than
+    `--threshold` slower or makes more database round trips.
+    """
+
+    runner = Benchmark(
+        iterations=iterations,
+        warmup=warmup,
+        concurrency=concurrency,
+        response_cache=response_cache,
+    )
+
+    rich.print("running benchmark...")
+    results = asyncio.run(runner.run(BENCHMARK_QUERIES))
+
+    table = rich.table.Table(
+        "query", "p50 ms", "p95 ms", "p99 ms", "req/s", "db calls", "peak KiB"
+    )
+
+    for name, summary in results["queries"].items():
+        table.add_row(
+            name,
+            f"{summary['p50_ms']:.2f}",
+            f"{summary['p95_ms']:.2f}",
+            f"{summary['p99_ms']:.2f}",
+            f"{summary['throughput']:.0f}",
+            str(summary["db_round_trips"]),
+            f"{summary['peak_memory_kb']:.0f}",
+        )
+
+    rich.print(table)
+
+    if output is not None:
+        save(results, output)
+
+    if baseline is not None:
+        regressions = compare(results, load(baseline), threshold)
+
+        for regression in regressions:
+            rich.print(f"[red]{regression}[/red]")
+
+        if regressions:
+            raise typer.Exit(code=1)
+
+
+@app.command()
+def microbenchmark(
+    iterations: int = 10_000,
+    output: Optional[Path] = None,
+    baseline: Optional[Path] = None,
+    threshold: float = 0.2,
+):
+    """Times the helpers called for every row, like `from_row` and the global
+    id functions, on synthetic rows.
+
+    With `--baseline`, exits with an error when a helper is more than
+    `--threshold` slower or retains more memory blocks.
+    """
+
+    results = {
+        benchmark.name: benchmark.run(iterations)
+        for benchmark in get_microbenchmarks(iterations)
+    }
+
+    table = rich.table.Table(
+        "helper", "ns/op", "peak bytes/op", "retained blocks/op", "retained bytes/op"
+    )
+
+    for name, result in results.items():
+        table.add_row(
+            name,
+            f"{result['ns_per_op']:.0f}",
+            f"{result['peak_bytes_per_op']:.0f}",
+            f"{result['retained_blocks_per_op']:.1f}",
+            f"{result['retained_bytes_per_op']:.0f}",
+        )
+
+    rich.print(table)
+
+    if output is not None:
+        save(results, output)
+
+    if baseline is not None:
+        regressions = compare_microbenchmarks(results, load(baseline), threshold)
+
+        for regression in regressions:
+            rich.print(f"[red]{regression}[/red]")
+
+        if regressions:
+            raise typer.Exit(code=1)
+
+
 @app.command()
 def diff_introspection():
     import subprocess
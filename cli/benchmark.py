@@ -0,0 +1,193 @@
+import asyncio
+import gc
+import json
+import os
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+from typing import Any
+
+import httpx
+
+
+@dataclass
+class QueryResult:
+    # wall clock time of each request, in seconds
+    latencies: list[float] = field(default_factory=list)
+    # database queries made by a single request, by "table.method"
+    db_calls: Counter[str] = field(default_factory=Counter)
+    # peak memory allocated while running a single request, in bytes
+    peak_memory: int = 0
+    errors: int = 0
+    elapsed: float = 0
+
+    def summary(self) -> dict[str, Any]:
+        percentiles = quantiles(self.latencies, n=100, method="inclusive")
+
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "p50_ms": percentiles[49] * 1000,
+            "p95_ms": percentiles[94] * 1000,
+            "p99_ms": percentiles[98] * 1000,
+            "throughput": len(self.latencies) / self.elapsed if self.elapsed else 0,
+            "db_round_trips": sum(self.db_calls.values()),
+            "db_calls": dict(sorted(self.db_calls.items())),
+            "peak_memory_kb": self.peak_memory / 1024,
+        }
+
+
+@dataclass
+class Benchmark:
+    """Runs queries against the app in the same process, through its ASGI
+    interface, so the numbers don't depend on the network or on uvicorn.
+
+    The response cache is disabled unless `response_cache` is set, as it
+    would otherwise measure the cache instead of the queries.
+    """
+
+    iterations: int = 50
+    warmup: int = 5
+    concurrency: int = 1
+    response_cache: bool = False
+
+    db_calls: Counter[str] = field(default_factory=Counter)
+
+    def record_call(self, table_name: str, method: str, duration: float) -> None:
+        self.db_calls[f"{table_name}.{method}"] += 1
+
+    async def run(self, query_paths: list[Path]) -> dict[str, Any]:
+        import app as app_module
+        from swapi.recording import RecordingClient
+        from swapi.response_cache import ResponseCache
+
+        await app_module.startup()
+
+        db = app_module.db
+        app_module.db = RecordingClient(db, self.record_call)
+
+        # the cache is enabled, or disabled, for the benchmark only
+        cache = app_module.response_cache
+        max_entries = cache.max_entries
+        cache.max_entries = (
+            max_entries or ResponseCache.max_entries if self.response_cache else 0
+        )
+
+        transport = httpx.ASGITransport(app=app_module.app)
+
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark"
+            ) as client:
+                results = {
+                    os.path.relpath(path): await self.run_query(
+                        client, path.read_text()
+                    )
+                    for path in query_paths
+                }
+        finally:
+            app_module.db = db
+            cache.max_entries = max_entries
+            await app_module.shutdown()
+
+        return {
+            "settings": {
+                "iterations": self.iterations,
+                "concurrency": self.concurrency,
+                "data_source": app_module.DATA_SOURCE,
+                "response_cache": self.response_cache,
+            },
+            "queries": {name: result.summary() for name, result in results.items()},
+        }
+
+    async def run_query(self, client: httpx.AsyncClient, query: str) -> QueryResult:
+        result = QueryResult()
+
+        for _ in range(self.warmup):
+            await self.request(client, query, result)
+
+        # round trips and memory of a single request, measured apart so that
+        # concurrent requests and tracing don't skew them or the latencies
+        self.db_calls.clear()
+        gc.collect()
+        tracemalloc.start()
+
+        try:
+            await self.request(client, query, result)
+            _, result.peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result.db_calls = Counter(self.db_calls)
+        result.latencies.clear()
+        result.errors = 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _request():
+            async with semaphore:
+                await self.request(client, query, result)
+
+        start = perf_counter()
+        await asyncio.gather(*(_request() for _ in range(self.iterations)))
+        result.elapsed = perf_counter() - start
+
+        return result
+
+    async def request(
+        self, client: httpx.AsyncClient, query: str, result: QueryResult
+    ) -> None:
+        start = perf_counter()
+        response = await client.post(
+            "/graphql",
+            json={"query": query},
+            headers={"Accept": "application/json"},
+        )
+        result.latencies.append(perf_counter() - start)
+
+        if response.status_code != 200 or response.json().get("errors"):
+            result.errors += 1
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Returns the regressions of `results` compared to `baseline`.
+
+    Latencies regress when they are more than `threshold` (a fraction) slower,
+    database round trips regress when there are more of them at all.
+    """
+
+    regressions = []
+
+    for name, summary in results["queries"].items():
+        previous = baseline["queries"].get(name)
+
+        if previous is None:
+            continue
+
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if summary[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} went from {previous[metric]:.2f} "
+                    f"to {summary[metric]:.2f}"
+                )
+
+        if summary["db_round_trips"] > previous["db_round_trips"]:
+            regressions.append(
+                f"{name}: db_round_trips went from {previous['db_round_trips']} "
+                f"to {summary['db_round_trips']}"
+            )
+
+    return regressions
+
+
+def save(results: dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(results, indent=2) + "\n")
+
+
+def load(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text())
@@ -13,6 +13,12 @@ STARSHIP_QUERY = HERE / "queries/starships.graphql"
 INTROSPECTION_QUERY = HERE / "queries/introspection.graphql"
 PAGINATION_QUERY = HERE / "queries/pagination.graphql"
 
+# the queries in the docs and the ones used to test the implementation
+BENCHMARK_QUERIES = [
+    *sorted((HERE.parent / "queries").glob("*.graphql")),
+    *sorted((HERE / "queries").glob("*.graphql")),
+]
+
 ALL_QUERIES = [
     FILMS_QUERY,
     PEOPLE_QUERY,
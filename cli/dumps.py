@@ -0,0 +1,139 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import prisma
+from schema import NODE_TYPES, TABLE_NODE_TYPES, schema
+from swapi.node import Node
+
+from strawberry.types.base import get_object_definition
+
+from .importer import LINKS, SOURCES, Items
+
+
+# dumps with these suffixes have one {"table": ..., "item": ...} object per
+# line, the others are a single object with the items of each table
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+# table name -> the type name of the global IDs of its rows
+TYPE_NAMES = {
+    table_name: type_name for type_name, (table_name, _) in NODE_TYPES.items()
+}
+
+# table name -> its foreign key columns, with the field they are returned as
+# by the reference API and the table they reference
+REFERENCES = {
+    "person": {
+        "homeworld_id": ("homeworld", "planet"),
+        "species_id": ("species", "species"),
+    },
+    "species": {"homeworld_id": ("homeworld", "planet")},
+}
+
+# relation in `LINKS` -> the connection field returning its rows in the
+# reference API, and their table
+CONNECTIONS = {
+    "films": ("filmConnection", "film"),
+    "species": ("speciesConnection", "species"),
+    "starships": ("starshipConnection", "starship"),
+    "vehicles": ("vehicleConnection", "vehicle"),
+    "planets": ("planetConnection", "planet"),
+}
+
+
+def read_dump(path: Path) -> Items:
+    """Returns the items of each table in the dump at `path`, in the shape
+    returned by the reference API, so they can be imported by `Importer`."""
+
+    items: Items = {table_name: [] for table_name in SOURCES}
+
+    with path.open() as file:
+        if path.suffix in NDJSON_SUFFIXES:
+            records = (json.loads(line) for line in file if line.strip())
+            tables = ((record["table"], [record["item"]]) for record in records)
+        else:
+            tables = json.load(file).items()
+
+        for table_name, table_items in tables:
+            if table_name not in items:
+                raise ValueError(f"Unknown table {table_name!r} in {path}")
+
+            items[table_name] += table_items
+
+    return items
+
+
+def write_dump(path: Path, items: Items) -> None:
+    with path.open("w") as file:
+        if path.suffix in NDJSON_SUFFIXES:
+            for table_name, table_items in items.items():
+                for item in table_items:
+                    file.write(json.dumps({"table": table_name, "item": item}))
+                    file.write("\n")
+        else:
+            json.dump(items, file, indent=2)
+
+
+def _get_item(table_name: str, row: Any) -> dict[str, Any]:
+    """Returns `row` in the shape of the items returned by the reference API,
+    with the fields read by `Importer`."""
+
+    NodeType = TABLE_NODE_TYPES[table_name]
+    node = NodeType.from_row(row)
+    item: dict[str, Any] = {"id": node.id}
+
+    for field in get_object_definition(NodeType, strict=True).fields:
+        if field.python_name in NodeType.COLUMNS:
+            name = schema.config.name_converter.get_graphql_name(field)
+            item[name] = getattr(node, field.python_name)
+
+    for column, (field_name, referenced_table) in REFERENCES.get(
+        table_name, {}
+    ).items():
+        referenced_id = getattr(row, column)
+        item[field_name] = (
+            None
+            if referenced_id is None
+            else {"id": _get_global_id(referenced_table, referenced_id)}
+        )
+
+    for relation in LINKS[table_name]:
+        connection_field, linked_table = CONNECTIONS[relation]
+        item[connection_field] = {
+            relation: [
+                {"id": _get_global_id(linked_table, linked_row.id)}
+                for linked_row in getattr(row, relation)
+            ]
+        }
+
+    return item
+
+
+def _get_global_id(table_name: str, id_: int) -> str:
+    return Node.get_global_id(TYPE_NAMES[table_name], id_)
+
+
+async def get_database_items() -> Items:
+    """Returns the items of each table in the database.
+
+    The rows are read directly, with their links, instead of through the
+    API, whose connections are paginated: a truncated dump would delete the
+    missing rows when imported with `--incremental`.
+    """
+
+    db = prisma.Prisma()
+
+    await db.connect()
+
+    try:
+        return {
+            table_name: [
+                _get_item(table_name, row)
+                for row in await getattr(db, table_name).find_many(
+                    include={relation: True for relation in LINKS[table_name]} or None
+                )
+            ]
+            for table_name in SOURCES
+        }
+    finally:
+        await db.disconnect()
@@ -1,9 +1,12 @@
+import asyncio
 import json
-from base64 import b64decode
+from collections import Counter
 from dataclasses import dataclass
+from typing import Any
 
 import prisma
 from dateutil import parser
+from swapi.global_ids import from_global_id
 
 from .constants import (
     FILMS_QUERY,
@@ -14,241 +17,325 @@ from .constants import (
     STARSHIP_QUERY,
     VEHICLES_QUERY,
 )
-from .utils.query import query
+from .utils.query import QueryClient
+
+
+# table name -> (query, root field, list field) of its items in the reference
+# API, in the order the rows are created, as they connect to the ones of the
+# tables before them
+SOURCES = {
+    "planet": (PLANETS_QUERY, "allPlanets", "planets"),
+    "starship": (STARSHIP_QUERY, "allStarships", "starships"),
+    "species": (SPECIES_QUERY, "allSpecies", "species"),
+    "vehicle": (VEHICLES_QUERY, "allVehicles", "vehicles"),
+    "film": (FILMS_QUERY, "allFilms", "films"),
+    "person": (PEOPLE_QUERY, "allPeople", "people"),
+}
+
+# table name -> the relations whose links are set by its rows, the links of
+# a many-to-many relation are only set from one side
+LINKS = {
+    "planet": [],
+    "starship": [],
+    "species": [],
+    "vehicle": [],
+    "film": ["species", "starships", "vehicles", "planets"],
+    "person": ["films", "starships", "vehicles"],
+}
+
+# table name -> its items, as returned by the reference API
+Items = dict[str, list[dict[str, Any]]]
 
 
 @dataclass
 class Importer:
     db: prisma.Prisma
+    client: QueryClient
 
-    async def _load_people(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            PEOPLE_QUERY.read_text(),
-        )
+    def _person_data(self, person: dict) -> dict:
+        return {
+            "id": self._parse_id(person["id"]),
+            "name": person["name"],
+            "birth_year": person["birthYear"],
+            "eye_color": person["eyeColor"],
+            "gender": person["gender"],
+            "hair_color": person["hairColor"],
+            "height": person["height"],
+            "mass": person["mass"],
+            "homeworld_id": self._parse_id(person["homeworld"]["id"]),
+            "skin_color": person["skinColor"],
+            "created": parser.isoparse(person["created"]),
+            "edited": parser.isoparse(person["edited"]),
+            "species_id": (
+                self._parse_id(person["species"]["id"]) if person["species"] else None
+            ),
+            "films": {
+                "connect": [
+                    {"id": self._parse_id(film["id"])}
+                    for film in person["filmConnection"]["films"]
+                ]
+            },
+            "starships": {
+                "connect": [
+                    {"id": self._parse_id(starship["id"])}
+                    for starship in person["starshipConnection"]["starships"]
+                ]
+            },
+            "vehicles": {
+                "connect": [
+                    {"id": self._parse_id(vehicle["id"])}
+                    for vehicle in person["vehicleConnection"]["vehicles"]
+                ]
+            },
+        }
 
-        people = response["data"]["allPeople"]["people"]
-
-        for person in people:
-            await self.db.person.create(
-                data={
-                    "id": self._parse_id(person["id"]),
-                    "name": person["name"],
-                    "birth_year": person["birthYear"],
-                    "eye_color": person["eyeColor"],
-                    "gender": person["gender"],
-                    "hair_color": person["hairColor"],
-                    "height": person["height"],
-                    "mass": person["mass"],
-                    "homeworld_id": self._parse_id(person["homeworld"]["id"]),
-                    "skin_color": person["skinColor"],
-                    "created": parser.isoparse(person["created"]),
-                    "edited": parser.isoparse(person["edited"]),
-                    "species_id": (
-                        self._parse_id(person["species"]["id"])
-                        if person["species"]
-                        else None
-                    ),
-                    "films": {
-                        "connect": [
-                            {"id": self._parse_id(film["id"])}
-                            for film in person["filmConnection"]["films"]
-                        ]
-                    },
-                    "starships": {
-                        "connect": [
-                            {"id": self._parse_id(starship["id"])}
-                            for starship in person["starshipConnection"]["starships"]
-                        ]
-                    },
-                    "vehicles": {
-                        "connect": [
-                            {"id": self._parse_id(vehicle["id"])}
-                            for vehicle in person["vehicleConnection"]["vehicles"]
-                        ]
-                    },
-                }
-            )
+    def _film_data(self, film: dict) -> dict:
+        return {
+            "id": self._parse_id(film["id"]),
+            "title": film["title"],
+            "episode_id": film["episodeID"],
+            "opening_crawl": film["openingCrawl"],
+            "director": film["director"],
+            "producers": json.dumps(film["producers"]),
+            "release_date": parser.isoparse(film["releaseDate"]),
+            "created": parser.isoparse(film["created"]),
+            "edited": parser.isoparse(film["edited"]),
+            "species": {
+                "connect": [
+                    {"id": self._parse_id(specie["id"])}
+                    for specie in film["speciesConnection"]["species"]
+                ]
+            },
+            "starships": {
+                "connect": [
+                    {"id": self._parse_id(starship["id"])}
+                    for starship in film["starshipConnection"]["starships"]
+                ]
+            },
+            "vehicles": {
+                "connect": [
+                    {"id": self._parse_id(vehicle["id"])}
+                    for vehicle in film["vehicleConnection"]["vehicles"]
+                ]
+            },
+            "planets": {
+                "connect": [
+                    {"id": self._parse_id(planet["id"])}
+                    for planet in film["planetConnection"]["planets"]
+                ]
+            },
+        }
 
-    async def _load_films(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            FILMS_QUERY.read_text(),
-        )
+    def _planet_data(self, planet: dict) -> dict:
+        return {
+            "id": self._parse_id(planet["id"]),
+            "name": planet["name"],
+            "rotation_period": planet["rotationPeriod"],
+            "orbital_period": planet["orbitalPeriod"],
+            "diameter": planet["diameter"],
+            "climates": json.dumps(planet["climates"] or []),
+            "gravity": planet["gravity"],
+            "terrains": json.dumps(planet["terrains"] or []),
+            "surface_water": planet["surfaceWater"],
+            "population": planet["population"],
+            "created": parser.isoparse(planet["created"]),
+            "edited": parser.isoparse(planet["edited"]),
+        }
 
-        films = response["data"]["allFilms"]["films"]
-
-        # create many is not supported by sqlite
-
-        for film in films:
-            await self.db.film.create(
-                data={
-                    "id": self._parse_id(film["id"]),
-                    "title": film["title"],
-                    "episode_id": film["episodeID"],
-                    "opening_crawl": film["openingCrawl"],
-                    "director": film["director"],
-                    "producers": json.dumps(film["producers"]),
-                    "release_date": parser.isoparse(film["releaseDate"]),
-                    "created": parser.isoparse(film["created"]),
-                    "edited": parser.isoparse(film["edited"]),
-                    "species": {
-                        "connect": [
-                            {"id": self._parse_id(specie["id"])}
-                            for specie in film["speciesConnection"]["species"]
-                        ]
-                    },
-                    "starships": {
-                        "connect": [
-                            {"id": self._parse_id(starship["id"])}
-                            for starship in film["starshipConnection"]["starships"]
-                        ]
-                    },
-                    "vehicles": {
-                        "connect": [
-                            {"id": self._parse_id(vehicle["id"])}
-                            for vehicle in film["vehicleConnection"]["vehicles"]
-                        ]
-                    },
-                    "planets": {
-                        "connect": [
-                            {"id": self._parse_id(planet["id"])}
-                            for planet in film["planetConnection"]["planets"]
-                        ]
-                    },
-                }
-            )
+    def _species_data(self, specie: dict) -> dict:
+        return {
+            "id": self._parse_id(specie["id"]),
+            "name": specie["name"],
+            "classification": specie["classification"],
+            "designation": specie["designation"],
+            "average_height": specie["averageHeight"],
+            "average_lifespan": specie["averageLifespan"],
+            "eye_colors": json.dumps(specie["eyeColors"] or []),
+            "hair_colors": json.dumps(specie["hairColors"] or []),
+            "skin_colors": json.dumps(specie["skinColors"] or []),
+            "language": specie["language"],
+            "created": parser.isoparse(specie["created"]),
+            "edited": parser.isoparse(specie["edited"]),
+            "homeworld_id": (
+                self._parse_id(specie["homeworld"]["id"])
+                if specie["homeworld"] is not None
+                else None
+            ),
+        }
 
-    async def _load_planets(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            PLANETS_QUERY.read_text(),
-        )
+    def _vehicle_data(self, vehicle: dict) -> dict:
+        return {
+            "id": self._parse_id(vehicle["id"]),
+            "name": vehicle["name"],
+            "model": vehicle["model"],
+            "vehicle_class": vehicle["vehicleClass"],
+            "manufacturers": json.dumps(vehicle["manufacturers"]),
+            "length": vehicle["length"],
+            "cost_in_credits": vehicle["costInCredits"],
+            "crew": vehicle["crew"],
+            "passengers": vehicle["passengers"],
+            "max_atmosphering_speed": vehicle["maxAtmospheringSpeed"],
+            "cargo_capacity": vehicle["cargoCapacity"],
+            "consumables": vehicle["consumables"],
+            "created": parser.isoparse(vehicle["created"]),
+            "edited": parser.isoparse(vehicle["edited"]),
+        }
 
-        planets = response["data"]["allPlanets"]["planets"]
-
-        for planet in planets:
-            await self.db.planet.create(
-                data={
-                    "id": self._parse_id(planet["id"]),
-                    "name": planet["name"],
-                    "rotation_period": planet["rotationPeriod"],
-                    "orbital_period": planet["orbitalPeriod"],
-                    "diameter": planet["diameter"],
-                    "climates": json.dumps(planet["climates"] or []),
-                    "gravity": planet["gravity"],
-                    "terrains": json.dumps(planet["terrains"] or []),
-                    "surface_water": planet["surfaceWater"],
-                    "population": planet["population"],
-                    "created": parser.isoparse(planet["created"]),
-                    "edited": parser.isoparse(planet["edited"]),
-                }
-            )
+    def _starship_data(self, starship: dict) -> dict:
+        return {
+            "id": self._parse_id(starship["id"]),
+            "name": starship["name"],
+            "model": starship["model"],
+            "starship_class": starship["starshipClass"],
+            "manufacturers": json.dumps(starship["manufacturers"]),
+            "length": starship["length"],
+            "cost_in_credits": starship["costInCredits"],
+            "crew": starship["crew"],
+            "passengers": starship["passengers"],
+            "max_atmosphering_speed": starship["maxAtmospheringSpeed"],
+            "hyperdrive_rating": starship["hyperdriveRating"],
+            "MGLT": starship["MGLT"],
+            "cargo_capacity": starship["cargoCapacity"],
+            "consumables": starship["consumables"],
+            "created": parser.isoparse(starship["created"]),
+            "edited": parser.isoparse(starship["edited"]),
+        }
 
-    async def _load_species(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            SPECIES_QUERY.read_text(),
-        )
+    async def fetch_all(self) -> Items:
+        """Returns the items of each table from the reference API, fetched
+        concurrently."""
 
-        species = response["data"]["allSpecies"]["species"]
-
-        for specie in species:
-            await self.db.species.create(
-                data={
-                    "id": self._parse_id(specie["id"]),
-                    "name": specie["name"],
-                    "classification": specie["classification"],
-                    "designation": specie["designation"],
-                    "average_height": specie["averageHeight"],
-                    "average_lifespan": specie["averageLifespan"],
-                    "eye_colors": json.dumps(specie["eyeColors"] or []),
-                    "hair_colors": json.dumps(specie["hairColors"] or []),
-                    "skin_colors": json.dumps(specie["skinColors"] or []),
-                    "language": specie["language"],
-                    "created": parser.isoparse(specie["created"]),
-                    "edited": parser.isoparse(specie["edited"]),
-                    "homeworld_id": (
-                        self._parse_id(specie["homeworld"]["id"])
-                        if specie["homeworld"] is not None
-                        else None
-                    ),
-                }
+        responses = await asyncio.gather(
+            *(
+                self.client.query(REFERENCE_API_URL, query_path.read_text())
+                for query_path, _, _ in SOURCES.values()
             )
-
-    async def _load_vehicles(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            VEHICLES_QUERY.read_text(),
         )
 
-        vehicles = response["data"]["allVehicles"]["vehicles"]
-
-        for vehicle in vehicles:
-            await self.db.vehicle.create(
-                data={
-                    "id": self._parse_id(vehicle["id"]),
-                    "name": vehicle["name"],
-                    "model": vehicle["model"],
-                    "vehicle_class": vehicle["vehicleClass"],
-                    "manufacturers": json.dumps(vehicle["manufacturers"]),
-                    "length": vehicle["length"],
-                    "cost_in_credits": vehicle["costInCredits"],
-                    "crew": vehicle["crew"],
-                    "passengers": vehicle["passengers"],
-                    "max_atmosphering_speed": vehicle["maxAtmospheringSpeed"],
-                    "cargo_capacity": vehicle["cargoCapacity"],
-                    "consumables": vehicle["consumables"],
-                    "created": parser.isoparse(vehicle["created"]),
-                    "edited": parser.isoparse(vehicle["edited"]),
-                }
-            )
+        items: Items = {}
 
-    async def _load_starships(self) -> None:
-        response = await query(
-            REFERENCE_API_URL,
-            STARSHIP_QUERY.read_text(),
-        )
+        for (table_name, (_, root_field, list_field)), response in zip(
+            SOURCES.items(), responses
+        ):
+            connection = response["data"][root_field]
 
-        starships = response["data"]["allStarships"]["starships"]
-
-        for starship in starships:
-            await self.db.starship.create(
-                data={
-                    "id": self._parse_id(starship["id"]),
-                    "name": starship["name"],
-                    "model": starship["model"],
-                    "starship_class": starship["starshipClass"],
-                    "manufacturers": json.dumps(starship["manufacturers"]),
-                    "length": starship["length"],
-                    "cost_in_credits": starship["costInCredits"],
-                    "crew": starship["crew"],
-                    "passengers": starship["passengers"],
-                    "max_atmosphering_speed": starship["maxAtmospheringSpeed"],
-                    "hyperdrive_rating": starship["hyperdriveRating"],
-                    "MGLT": starship["MGLT"],
-                    "cargo_capacity": starship["cargoCapacity"],
-                    "consumables": starship["consumables"],
-                    "created": parser.isoparse(starship["created"]),
-                    "edited": parser.isoparse(starship["edited"]),
-                }
-            )
+            # rows missing from the items would be deleted by `update_all`
+            if connection["pageInfo"]["hasNextPage"]:
+                raise ValueError(
+                    f"{root_field} returned only the first "
+                    f"{len(connection[list_field])} {list_field}"
+                )
+
+            items[table_name] = connection[list_field]
+
+        return items
+
+    async def import_all(self, items: Items | None = None) -> None:
+        """Replaces the data with `items`, or the ones of the reference API.
+
+        All the rows are written by a single batch, which Prisma runs in one
+        transaction: the server keeps serving the previous data until it's
+        committed, and nothing changes if any of it fails.
+        """
+
+        if items is None:
+            items = await self.fetch_all()
+
+        async with self.db.batch_() as batcher:
+            # the rows referencing others are deleted first
+            for table_name in reversed(SOURCES):
+                getattr(batcher, table_name).delete_many()
+
+            for table_name in SOURCES:
+                convert = getattr(self, f"_{table_name}_data")
+
+                for item in items[table_name]:
+                    getattr(batcher, table_name).create(data=convert(item))
+
+    async def update_all(self, items: Items | None = None) -> Counter[str]:
+        """Applies the differences between `items`, or the ones of the
+        reference API, and the data in the database.
+
+        Rows are only updated when their `edited` timestamp changed, and only
+        the links that were added or removed are written. Rows missing from
+        `items` are deleted. The changes are written by a single batch, as in
+        `import_all`, and their number is returned by kind.
+        """
+
+        if items is None:
+            items = await self.fetch_all()
+
+        # (table name, action, arguments)
+        operations: list[tuple[str, str, dict[str, Any]]] = []
+        deletions: list[tuple[str, str, dict[str, Any]]] = []
+        changes: Counter[str] = Counter()
+
+        for table_name in SOURCES:
+            links = LINKS[table_name]
+            rows = {
+                row.id: row
+                for row in await getattr(self.db, table_name).find_many(
+                    include={relation: True for relation in links} or None
+                )
+            }
+            convert = getattr(self, f"_{table_name}_data")
+
+            for item in items[table_name]:
+                data = convert(item)
+                row = rows.pop(data["id"], None)
+
+                if row is None:
+                    operations.append((table_name, "create", {"data": data}))
+                    changes["created"] += 1
+                    continue
+
+                update = (
+                    {}
+                    if row.edited == data["edited"]
+                    else {
+                        name: value
+                        for name, value in data.items()
+                        if name != "id" and name not in links
+                    }
+                )
+
+                for relation in links:
+                    ids = {link["id"] for link in data[relation]["connect"]}
+                    current_ids = {linked.id for linked in getattr(row, relation)}
+
+                    if ids != current_ids:
+                        update[relation] = {
+                            "connect": [{"id": id_} for id_ in ids - current_ids],
+                            "disconnect": [{"id": id_} for id_ in current_ids - ids],
+                        }
+
+                if update:
+                    operations.append(
+                        (
+                            table_name,
+                            "update",
+                            {"where": {"id": row.id}, "data": update},
+                        )
+                    )
+                    changes["updated"] += 1
+
+            if rows:
+                deletions.append(
+                    (table_name, "delete_many", {"where": {"id": {"in": list(rows)}}})
+                )
+                changes["deleted"] += len(rows)
+
+        if not operations and not deletions:
+            return changes
+
+        async with self.db.batch_() as batcher:
+            # after the updates, so that no row references the deleted ones
+            # anymore, and the rows referencing others are deleted first
+            for table_name, action, arguments in [*operations, *deletions[::-1]]:
+                getattr(getattr(batcher, table_name), action)(**arguments)
 
-    async def import_all(self) -> None:
-        await self.db.person.delete_many()
-        await self.db.planet.delete_many()
-        await self.db.species.delete_many()
-        await self.db.film.delete_many()
-        await self.db.vehicle.delete_many()
-        await self.db.starship.delete_many()
-
-        await self._load_planets()
-        await self._load_starships()
-        await self._load_species()
-        await self._load_vehicles()
-        await self._load_films()
-        await self._load_people()
+        return changes
 
     @staticmethod
     def _parse_id(global_id: str) -> int:
-        return int(b64decode(global_id).split(b":")[1])
+        return from_global_id(global_id)[1]
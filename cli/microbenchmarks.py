@@ -0,0 +1,246 @@
+import datetime
+import gc
+import itertools
+import json
+import tracemalloc
+from dataclasses import dataclass
+from timeit import Timer
+from types import SimpleNamespace
+from typing import Any, Callable, Sequence
+
+
+# synthetic values for the columns converted by each function, by name
+SYNTHETIC_VALUES: dict[str, Any] = {
+    "decode_list": '["arid", "temperate", "tropical"]',
+    "format_datetime": datetime.datetime(2014, 12, 10, 16, 36, 50, 509000),
+    "format_date": datetime.datetime(1977, 5, 25),
+}
+
+
+# global id type name -> number of rows in the dataset, the global id
+# benchmarks cycle through the ids of all of them, as a request would
+DATASET_ROWS = {
+    "films": 6,
+    "people": 82,
+    "planets": 60,
+    "species": 37,
+    "starships": 36,
+    "vehicles": 39,
+}
+
+
+def get_synthetic_row(NodeType: Any, id_: int = 1) -> SimpleNamespace:
+    """Returns a row with a plausible value for each of `NodeType.COLUMNS`,
+    standing in for the Prisma model so benchmarks don't need a database."""
+
+    values: dict[str, Any] = {"id": id_}
+
+    for column, convert in NodeType.COLUMNS.items():
+        if convert is not None:
+            values[column] = SYNTHETIC_VALUES[convert.__name__]
+        elif column.endswith("_id"):
+            values[column] = id_
+        else:
+            values[column] = "synthetic"
+
+    return SimpleNamespace(**values)
+
+
+@dataclass
+class Microbenchmark:
+    name: str
+    function: Callable[[], Any]
+    # called before each timed run and before measuring memory
+    setup: Callable[[], None] = lambda: None
+
+    def run(self, iterations: int, repeat: int = 5) -> dict[str, float]:
+        """Returns the best time per call over `repeat` runs, and the memory
+        used by each call.
+
+        `peak_bytes_per_op` is the most memory a call had allocated at once,
+        temporary allocations included. The retained blocks and bytes are
+        the ones it allocated that are still alive when it returns (the
+        result and anything it caches).
+        """
+
+        timer = Timer(self.function, setup=self.setup)
+        best = min(timer.repeat(repeat=repeat, number=iterations))
+
+        results: list[Any] = [None] * iterations
+        peak = 0
+
+        self.setup()
+        gc.collect()
+        tracemalloc.start()
+
+        try:
+            for index in range(iterations):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                results[index] = self.function()
+                peak += tracemalloc.get_traced_memory()[1] - before
+
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        statistics = [
+            stat
+            for stat in snapshot.statistics("filename")
+            # the measuring loop itself
+            if stat.traceback[0].filename != __file__
+        ]
+
+        return {
+            "ns_per_op": best / iterations * 1e9,
+            "peak_bytes_per_op": peak / iterations,
+            "retained_blocks_per_op": (
+                sum(stat.count for stat in statistics) / iterations
+            ),
+            "retained_bytes_per_op": sum(stat.size for stat in statistics) / iterations,
+        }
+
+
+def _cycle(
+    name: str,
+    function: Callable[..., Any],
+    cached_function: Any,
+    arguments: Sequence[tuple[Any, ...]],
+    cached: bool,
+) -> Microbenchmark:
+    """Returns a benchmark calling `function` with each of `arguments` in
+    turn, `cached_function` being the `lru_cache` it goes through.
+
+    With `cached`, the cache is filled with all the arguments before each
+    run, so only hits are measured. Otherwise it's emptied, and there
+    should be at least as many `arguments` as iterations, so that every
+    call is the first one for its arguments.
+    """
+
+    iterator: Any = iter(())
+
+    def setup() -> None:
+        nonlocal iterator
+
+        cached_function.cache_clear()
+
+        if cached:
+            for values in arguments:
+                function(*values)
+
+        iterator = itertools.cycle(arguments)
+
+    return Microbenchmark(
+        f"{name} ({'cached' if cached else 'first call'})",
+        lambda: function(*next(iterator)),
+        setup,
+    )
+
+
+def get_microbenchmarks(iterations: int) -> list[Microbenchmark]:
+    from swapi import global_ids
+    from swapi.film import Film
+    from swapi.node import Node
+    from swapi.people import Person
+    from swapi.planets import Planet
+    from swapi.species import Species
+    from swapi.starships import Starship
+    from swapi.utils.datetime import format_datetime
+    from swapi.utils.lists import decode_list
+    from swapi.utils.rows import get_selected_columns
+    from swapi.vehicles import Vehicle
+
+    created = SYNTHETIC_VALUES["format_datetime"]
+    json_list = SYNTHETIC_VALUES["decode_list"]
+
+    # the rows of the dataset, and as many distinct rows as iterations, for
+    # the first calls
+    dataset_ids = [
+        (type_name, id_)
+        for type_name, count in DATASET_ROWS.items()
+        for id_ in range(1, count + 1)
+    ]
+    distinct_ids = [
+        (type_name, id_)
+        for id_ in range(1, iterations // len(DATASET_ROWS) + 2)
+        for type_name in DATASET_ROWS
+    ]
+    encode = global_ids.to_global_id.__wrapped__
+
+    benchmarks = []
+
+    for cached, ids in ((False, distinct_ids), (True, dataset_ids)):
+        benchmarks += [
+            _cycle(
+                "Node.get_global_id",
+                Node.get_global_id,
+                global_ids.to_global_id,
+                ids,
+                cached,
+            ),
+            _cycle(
+                "Node.get_id_from_string",
+                Node.get_id_from_string,
+                global_ids.from_global_id,
+                [(encode(*values),) for values in ids],
+                cached,
+            ),
+        ]
+
+    benchmarks += [
+        Microbenchmark("format_datetime", lambda: format_datetime(created)),
+        Microbenchmark("json.loads", lambda: json.loads(json_list)),
+        Microbenchmark("decode_list", lambda: decode_list(json_list)),
+    ]
+
+    for NodeType in (Film, Person, Planet, Species, Starship, Vehicle):
+        row = get_synthetic_row(NodeType)
+        # a typical projection, only the name is selected
+        columns = get_selected_columns(NodeType, {"name"})
+
+        benchmarks += [
+            Microbenchmark(
+                f"{NodeType.__name__}.from_row",
+                lambda NodeType=NodeType, row=row: NodeType.from_row(row),
+            ),
+            Microbenchmark(
+                f"{NodeType.__name__}.from_row(name)",
+                lambda NodeType=NodeType, row=row, columns=columns: (
+                    NodeType.from_row(row, columns)
+                ),
+            ),
+        ]
+
+    return benchmarks
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Returns the helpers that are more than `threshold` (a fraction) slower
+    than in `baseline`, or retain more memory blocks per call."""
+
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get(name)
+
+        if previous is None:
+            continue
+
+        if result["ns_per_op"] > previous["ns_per_op"] * (1 + threshold):
+            regressions.append(
+                f"{name}: ns/op went from {previous['ns_per_op']:.0f} "
+                f"to {result['ns_per_op']:.0f}"
+            )
+
+        if round(result["retained_blocks_per_op"], 1) > round(
+            previous["retained_blocks_per_op"], 1
+        ):
+            regressions.append(
+                f"{name}: retained blocks/op went from "
+                f"{previous['retained_blocks_per_op']:.1f} "
+                f"to {result['retained_blocks_per_op']:.1f}"
+            )
+
+    return regressions
@@ -1,15 +1,159 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
 import httpx
 
 
-async def query(
-    url: str, query: str, variables: dict[str, dict] | None = None
-) -> dict[str, dict]:
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            json={"query": query, "variables": variables},
-            headers={"Accept": "application/json"},
+# statuses worth retrying, the others won't change on their own
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# requests to these hosts are never recorded, they are the server under test
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class MissingRecordingError(Exception):
+    pass
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Serves the responses recorded in `directory`, so that the commands can
+    run, and be timed, without network.
+
+    With `record`, requests without a recording are sent through `transport`
+    and their responses recorded. Requests to local hosts always go through
+    `transport`.
+    """
+
+    def __init__(
+        self, directory: Path, transport: httpx.AsyncBaseTransport, record: bool
+    ):
+        self.directory = directory
+        self.transport = transport
+        self.record = record
+
+    def _get_path(self, request: httpx.Request) -> Path:
+        key = hashlib.sha256(
+            b"\n".join(
+                [request.method.encode(), str(request.url).encode(), request.content]
+            )
+        ).hexdigest()
+
+        return self.directory / f"{key}.json"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host in LOCAL_HOSTS:
+            return await self.transport.handle_async_request(request)
+
+        path = self._get_path(request)
+
+        if path.exists():
+            recording = json.loads(path.read_text())
+        elif self.record:
+            response = await self.transport.handle_async_request(request)
+
+            try:
+                # decompressed, so the recording is served without encoding
+                content = await response.aread()
+            finally:
+                await response.aclose()
+
+            recording = {
+                "url": str(request.url),
+                "status": response.status_code,
+                "content_type": response.headers.get("content-type"),
+                "body": content.decode(),
+            }
+
+            if response.status_code < 500:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(recording))
+        else:
+            raise MissingRecordingError(
+                f"No recorded response for {request.method} {request.url} "
+                f"in {self.directory}, record it with --record"
+            )
+
+        return httpx.Response(
+            recording["status"],
+            headers={"content-type": recording["content_type"] or "application/json"},
+            content=recording["body"].encode(),
+        )
+
+
+class QueryClient:
+    """Sends GraphQL queries through a single pooled `httpx.AsyncClient`,
+    keeping connections alive between queries, using HTTP/2 when `h2` is
+    installed.
+
+    At most `max_concurrency` queries are sent at once, and failed ones are
+    retried `retries` times, waiting `backoff` seconds and twice as long
+    after each attempt. With `recordings`, responses are served by a
+    `RecordingTransport`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 6,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+        recordings: Path | None = None,
+        record: bool = False,
+    ):
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
         )
 
-    response.raise_for_status()
-    return response.json()
+        if recordings is not None:
+            transport = RecordingTransport(recordings, transport, record)
+
+        self.client = httpx.AsyncClient(transport=transport, timeout=timeout)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.retries = retries
+        self.backoff = backoff
+
+    async def __aenter__(self) -> "QueryClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.client.aclose()
+
+    async def query(
+        self, url: str, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                retry = attempt < self.retries
+
+                try:
+                    response = await self.client.post(
+                        url,
+                        json={"query": query, "variables": variables},
+                        headers={"Accept": "application/json"},
+                    )
+                except httpx.TransportError:
+                    if not retry:
+                        raise
+                else:
+                    if not retry or response.status_code not in RETRY_STATUSES:
+                        break
+
+                await asyncio.sleep(self.backoff * 2**attempt)
+
+        response.raise_for_status()
+        return response.json()
@@ -1,19 +1,81 @@
-from typing import Annotated
+import os
+from functools import partial
+from typing import Annotated, Any
 
 from swapi.context import Context
+from swapi.extensions.document_cache import DocumentCache, DocumentCacheStore
+from swapi.extensions.persisted_queries import (
+    PersistedQueries,
+    PersistedQueryRegistry,
+)
+from swapi.extensions.profiling import ProfileStore, Profiling
+from swapi.extensions.query_cost import QueryCost
 from swapi.film import Film, FilmsConnection, FilmsEdge
+from swapi.global_ids import from_row_id
 from swapi.node import Node
 from swapi.people import PeopleConnection, PeopleEdge, Person
 from swapi.planets import Planet, PlanetsConnection, PlanetsEdge
 from swapi.species import Species, SpeciesConnection, SpeciesEdge
 from swapi.starships import Starship, StarshipsConnection, StarshipsEdge
 from swapi.utils.connections import get_connection_resolver
+from swapi.utils.rows import get_node_from_row, get_selected_columns
+from swapi.utils.selection import get_selected_field_names
 from swapi.vehicles import Vehicle, VehiclesConnection, VehiclesEdge
 
 import strawberry
+from strawberry.schema.config import StrawberryConfig
 from strawberry.types.info import Info
 
 
+# global id type prefix -> (table name, node type)
+NODE_TYPES: dict[str, tuple[str, type]] = {
+    "films": ("film", Film),
+    "people": ("person", Person),
+    "planets": ("planet", Planet),
+    "species": ("species", Species),
+    "vehicles": ("vehicle", Vehicle),
+    "starships": ("starship", Starship),
+}
+
+TABLE_NODE_TYPES = dict(NODE_TYPES.values())
+
+
+async def _get_node(
+    info: Info[Context, None],
+    table_name: str,
+    id: strawberry.ID | None,
+    row_id: strawberry.ID | None,
+) -> Any | None:
+    """Returns a node either by its global `id` or by its `row_id`, as
+    accepted by the single object fields on `Root`.
+    """
+
+    if id:
+        type_name, parsed_id = Node.get_type_and_id_from_string(id)
+
+        if type_name not in NODE_TYPES or NODE_TYPES[type_name][0] != table_name:
+            return None
+    elif row_id:
+        parsed_id = from_row_id(row_id)
+    else:
+        return None
+
+    return await _load_node(info, table_name, parsed_id)
+
+
+async def _load_node(
+    info: Info[Context, None], table_name: str, row_id: int
+) -> Any | None:
+    NodeType = TABLE_NODE_TYPES[table_name]
+    columns = get_selected_columns(NodeType, get_selected_field_names(info))
+    row = await info.context["row_loader"].load((table_name, row_id, columns))
+
+    if row is None:
+        return None
+
+    return get_node_from_row(info.context["nodes"], NodeType, row, columns)
+
+
 @strawberry.type
 class Root:
     all_films: FilmsConnection | None = strawberry.field(
@@ -77,77 +139,118 @@ class Root:
     )
 
     @strawberry.field
-    def film(
+    async def film(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
-        film_id: Annotated[strawberry.ID | None, strawberry.argument(name="filmID")],
+        id: strawberry.ID | None = strawberry.UNSET,
+        film_id: Annotated[
+            strawberry.ID | None, strawberry.argument(name="filmID")
+        ] = strawberry.UNSET,
     ) -> Film | None:
-        return None
+        return await _get_node(info, "film", id, film_id)
 
     @strawberry.field
-    def person(
+    async def person(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
+        id: strawberry.ID | None = strawberry.UNSET,
         person_id: Annotated[
             strawberry.ID | None, strawberry.argument(name="personID")
-        ],
+        ] = strawberry.UNSET,
     ) -> Person | None:
-        return None
+        return await _get_node(info, "person", id, person_id)
 
     @strawberry.field
-    def planet(
+    async def planet(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
+        id: strawberry.ID | None = strawberry.UNSET,
         planet_id: Annotated[
             strawberry.ID | None, strawberry.argument(name="planetID")
-        ],
+        ] = strawberry.UNSET,
     ) -> Planet | None:
-        return None
+        return await _get_node(info, "planet", id, planet_id)
 
     @strawberry.field
-    def species(
+    async def species(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
+        id: strawberry.ID | None = strawberry.UNSET,
         species_id: Annotated[
             strawberry.ID | None, strawberry.argument(name="speciesID")
-        ],
+        ] = strawberry.UNSET,
     ) -> Species | None:
-        return None
+        return await _get_node(info, "species", id, species_id)
 
     @strawberry.field
-    def vehicle(
+    async def vehicle(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
+        id: strawberry.ID | None = strawberry.UNSET,
         vehicle_id: Annotated[
             strawberry.ID | None, strawberry.argument(name="vehicleID")
-        ],
+        ] = strawberry.UNSET,
     ) -> Vehicle | None:
-        return None
+        return await _get_node(info, "vehicle", id, vehicle_id)
 
     @strawberry.field
-    def starship(
+    async def starship(
         self,
         info: Info[Context, None],
-        id: strawberry.ID | None,
+        id: strawberry.ID | None = strawberry.UNSET,
         starship_id: Annotated[
             strawberry.ID | None, strawberry.argument(name="starshipID")
-        ],
+        ] = strawberry.UNSET,
     ) -> Starship | None:
-        return None
+        return await _get_node(info, "starship", id, starship_id)
 
     @strawberry.field
-    def node(
+    async def node(
         self,
         info: Info[Context, None],
         id: strawberry.ID,
     ) -> Node | None:
-        # TODO: implement this
-        return None
+        type_name, row_id = Node.get_type_and_id_from_string(id)
+
+        if type_name not in NODE_TYPES:
+            return None
+
+        return await _load_node(info, NODE_TYPES[type_name][0], row_id)
+
+
+# maximum number of documents kept for automatic persisted queries
+PERSISTED_QUERIES_SIZE = int(os.environ.get("SWAPI_PERSISTED_QUERIES_SIZE", "10000"))
+
+# memory budget, in bytes, for the parsed documents of ad-hoc queries
+DOCUMENT_CACHE_BYTES = int(
+    os.environ.get("SWAPI_DOCUMENT_CACHE_BYTES", str(32 * 1024 * 1024))
+)
+
+# profile every request, not only the ones sending the X-Swapi-Profile header
+PROFILE_ALL = os.environ.get("SWAPI_PROFILE_ALL") == "1"
+
+# maximum cost of an operation, roughly the number of objects it can return,
+# see `get_query_cost`
+MAX_QUERY_COST = int(os.environ.get("SWAPI_MAX_QUERY_COST", "50000"))
+
+# support @defer and @stream, whose results are sent as multipart responses,
+# operations using them are refused to the clients not accepting
+# multipart/mixed
+INCREMENTAL_DELIVERY = os.environ.get("SWAPI_INCREMENTAL_DELIVERY") == "1"
 
+persisted_queries = PersistedQueryRegistry(max_entries=PERSISTED_QUERIES_SIZE)
+document_cache = DocumentCacheStore(max_bytes=DOCUMENT_CACHE_BYTES)
+profiles = ProfileStore()
 
-schema = strawberry.Schema(query=Root)
+schema = strawberry.Schema(
+    query=Root,
+    extensions=[
+        partial(PersistedQueries, registry=persisted_queries),
+        partial(DocumentCache, store=document_cache),
+        partial(QueryCost, max_cost=MAX_QUERY_COST),
+        partial(Profiling, store=profiles, profile_all=PROFILE_ALL),
+    ],
+    config=StrawberryConfig(
+        enable_experimental_incremental_execution=INCREMENTAL_DELIVERY
+    ),
+)
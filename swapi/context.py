@@ -1,13 +1,24 @@
-from typing import TypedDict
+from collections.abc import Hashable
+from typing import Any, TypedDict
 
-from prisma import Prisma
 from starlette.background import BackgroundTasks
 from starlette.requests import Request
 from starlette.responses import Response
+from swapi.data_access.base import Client
+from swapi.loaders import RowKey
+from swapi.store import Store
+from swapi.utils.rows import NodeMap
+
+from strawberry.dataloader import DataLoader
 
 
 class Context(TypedDict):
     request: Request
-    db: Prisma
+    db: Client
+    store: Store | None
+    row_loader: DataLoader[RowKey, Any]
+    related_loaders: dict[Hashable, DataLoader[int, list[Any]]]
+    # nodes built during the request, see `get_node_from_row`
+    nodes: NodeMap
     background_tasks: BackgroundTasks
     response: Response
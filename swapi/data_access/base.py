@@ -0,0 +1,92 @@
+from typing import Any, Collection, Mapping, Protocol, Sequence
+
+
+# list relations of each table, as named in schema.prisma
+RELATIONS: dict[str, list[str]] = {
+    "film": ["characters", "species", "starships", "vehicles", "planets"],
+    "person": ["films", "starships", "vehicles"],
+    "planet": ["films"],
+    "species": ["films"],
+    "vehicle": ["pilots", "films"],
+    "starship": ["pilots", "films"],
+}
+
+# foreign key columns of each table
+FOREIGN_KEYS: dict[str, list[str]] = {
+    "person": ["homeworld_id", "species_id"],
+    "species": ["homeworld_id"],
+}
+
+
+class Table(Protocol):
+    """Queries made on a table, rows are returned sorted by id.
+
+    Rows have an attribute per column, as the models generated by Prisma.
+    `where` holds column values to filter on. `columns` is the projection the
+    rows are needed for, tables may return only those columns and `id`, or
+    all of them when it's `None`.
+    """
+
+    async def find_by_ids(
+        self, ids: Sequence[int], columns: Collection[str] | None = None
+    ) -> list[Any]:
+        """Returns the rows with the given ids, missing ones are skipped."""
+
+    async def find_by_relation(
+        self,
+        relation: str,
+        parent_ids: Sequence[int] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[tuple[int, Any]]:
+        """Returns `(parent id, row)` pairs for the rows linked to the parents
+        through the list relation `relation`, or to any parent when
+        `parent_ids` is `None`."""
+
+    async def find_by_foreign_key(
+        self,
+        foreign_key: str,
+        parent_ids: Sequence[int],
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        """Returns the rows whose `foreign_key` column is one of `parent_ids`,
+        the column is always returned."""
+
+    async def find_page(
+        self,
+        cursor: int | None,
+        take: int,
+        skip: int,
+        where: Mapping[str, Any] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        """Returns a page of rows with Prisma's cursor pagination semantics.
+
+        The page starts at the row with id `cursor` (the first row when it's
+        `None`), `skip` rows are skipped and `take` rows are returned,
+        going backwards when `take` is negative. The page is empty when
+        there's no row with id `cursor`.
+        """
+
+    async def find_all(self) -> list[Any]:
+        """Returns all the rows of the table."""
+
+    async def count(self, where: Mapping[str, Any] | None = None) -> int:
+        """Returns the number of rows matching `where`."""
+
+
+class Client(Protocol):
+    """Access to the tables of the dataset, as attributes named after the
+    models in schema.prisma, like `client.film`."""
+
+    film: Table
+    person: Table
+    planet: Table
+    species: Table
+    vehicle: Table
+    starship: Table
+
+    async def connect(self) -> None:
+        """Opens the connection, before any query is made."""
+
+    async def disconnect(self) -> None:
+        """Closes the connection."""
@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolStats:
+    acquisitions: int = 0
+    # acquisitions that found no idle connection
+    waits: int = 0
+    wait_time: float = 0
+    max_wait_time: float = 0
+    # sum of the time each connection was in use
+    busy_time: float = 0
+    max_in_use: int = 0
+
+
+@dataclass
+class Pool(Generic[T]):
+    """Fixed size pool of connections, opened with `open_connection` and
+    closed with `close_connection`.
+
+    Requests wait for a connection when all of them are in use, the time
+    spent waiting and the share of time connections are in use are
+    reported by `get_stats`.
+    """
+
+    open_connection: Callable[[], Awaitable[T]]
+    close_connection: Callable[[T], Awaitable[Any]]
+    size: int = 1
+
+    connections: list[T] = field(default_factory=list)
+    idle: asyncio.Queue[T] = field(default_factory=asyncio.Queue)
+    in_use: int = 0
+    opened_at: float = 0
+    stats: PoolStats = field(default_factory=PoolStats)
+
+    async def open(self) -> None:
+        self.connections = list(
+            await asyncio.gather(*(self.open_connection() for _ in range(self.size)))
+        )
+
+        for connection in self.connections:
+            self.idle.put_nowait(connection)
+
+        self.opened_at = perf_counter()
+
+    async def close(self) -> None:
+        await asyncio.gather(
+            *(self.close_connection(connection) for connection in self.connections)
+        )
+
+        self.connections = []
+        self.idle = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[T]:
+        start = perf_counter()
+
+        if self.idle.empty():
+            self.stats.waits += 1
+
+        connection = await self.idle.get()
+        acquired = perf_counter()
+
+        self.stats.acquisitions += 1
+        self.stats.wait_time += acquired - start
+        self.stats.max_wait_time = max(self.stats.max_wait_time, acquired - start)
+        self.in_use += 1
+        self.stats.max_in_use = max(self.stats.max_in_use, self.in_use)
+
+        try:
+            yield connection
+        finally:
+            self.in_use -= 1
+            self.stats.busy_time += perf_counter() - acquired
+            self.idle.put_nowait(connection)
+
+    def get_stats(self) -> dict[str, Any]:
+        uptime = perf_counter() - self.opened_at if self.opened_at else 0
+        acquisitions = self.stats.acquisitions
+
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "max_in_use": self.stats.max_in_use,
+            "acquisitions": acquisitions,
+            "waits": self.stats.waits,
+            "wait_ms_total": self.stats.wait_time * 1000,
+            "wait_ms_average": (
+                self.stats.wait_time / acquisitions * 1000 if acquisitions else None
+            ),
+            "wait_ms_max": self.stats.max_wait_time * 1000,
+            "utilization": (
+                self.stats.busy_time / (uptime * self.size) if uptime else None
+            ),
+        }
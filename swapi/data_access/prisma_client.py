@@ -0,0 +1,89 @@
+from typing import Any, Collection, Mapping, Sequence
+
+from prisma import Prisma
+
+
+class PrismaTable:
+    """Queries made through Prisma, which always returns all the columns, so
+    `columns` is ignored."""
+
+    def __init__(self, actions: Any):
+        self.actions = actions
+
+    async def find_by_ids(
+        self, ids: Sequence[int], columns: Collection[str] | None = None
+    ) -> list[Any]:
+        return await self.actions.find_many(where={"id": {"in": list(ids)}})
+
+    async def find_by_relation(
+        self,
+        relation: str,
+        parent_ids: Sequence[int] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[tuple[int, Any]]:
+        if parent_ids is None:
+            rows = await self.actions.find_many(
+                include={relation: True}, order={"id": "asc"}
+            )
+        else:
+            ids = list(parent_ids)
+            rows = await self.actions.find_many(
+                where={relation: {"some": {"id": {"in": ids}}}},
+                include={relation: {"where": {"id": {"in": ids}}}},
+                order={"id": "asc"},
+            )
+
+        return [(parent.id, row) for row in rows for parent in getattr(row, relation)]
+
+    async def find_by_foreign_key(
+        self,
+        foreign_key: str,
+        parent_ids: Sequence[int],
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        return await self.actions.find_many(
+            where={foreign_key: {"in": list(parent_ids)}},
+            order={"id": "asc"},
+        )
+
+    async def find_page(
+        self,
+        cursor: int | None,
+        take: int,
+        skip: int,
+        where: Mapping[str, Any] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        return await self.actions.find_many(
+            cursor={"id": cursor} if cursor else None,
+            take=take,
+            skip=skip,
+            where=dict(where or {}),
+            order={"id": "asc"},
+        )
+
+    async def find_all(self) -> list[Any]:
+        return await self.actions.find_many(order={"id": "asc"})
+
+    async def count(self, where: Mapping[str, Any] | None = None) -> int:
+        return await self.actions.count(where=dict(where or {}))
+
+
+class PrismaClient:
+    """Reads the dataset through Prisma's query engine."""
+
+    def __init__(self, prisma: Prisma | None = None):
+        self.prisma = prisma or Prisma()
+
+        self.film = PrismaTable(self.prisma.film)
+        self.person = PrismaTable(self.prisma.person)
+        self.planet = PrismaTable(self.prisma.planet)
+        self.species = PrismaTable(self.prisma.species)
+        self.vehicle = PrismaTable(self.prisma.vehicle)
+        self.starship = PrismaTable(self.prisma.starship)
+
+    async def connect(self) -> None:
+        await self.prisma.connect()
+
+    async def disconnect(self) -> None:
+        await self.prisma.disconnect()
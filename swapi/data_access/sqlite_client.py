@@ -0,0 +1,313 @@
+import datetime
+from os import PathLike
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Collection, Iterable, Mapping, Sequence
+
+import aiosqlite
+
+from .pool import Pool
+
+
+# table name -> name of its model in schema.prisma
+MODELS = {
+    "film": "Film",
+    "person": "Person",
+    "planet": "Planet",
+    "species": "Species",
+    "vehicle": "Vehicle",
+    "starship": "Starship",
+}
+
+# (table name, relation) -> (join table, column with the id of the rows of
+# the table, column with the id of the parent), Prisma names the join table
+# of an implicit many-to-many relation after the two models in alphabetical
+# order, with the id of the first one in column A
+JOIN_TABLES: dict[tuple[str, str], tuple[str, str, str]] = {
+    ("film", "characters"): ("_FilmToPerson", "A", "B"),
+    ("film", "species"): ("_FilmToSpecies", "A", "B"),
+    ("film", "starships"): ("_FilmToStarship", "A", "B"),
+    ("film", "vehicles"): ("_FilmToVehicle", "A", "B"),
+    ("film", "planets"): ("_FilmToPlanet", "A", "B"),
+    ("person", "films"): ("_FilmToPerson", "B", "A"),
+    ("person", "starships"): ("_PersonToStarship", "A", "B"),
+    ("person", "vehicles"): ("_PersonToVehicle", "A", "B"),
+    ("planet", "films"): ("_FilmToPlanet", "B", "A"),
+    ("species", "films"): ("_FilmToSpecies", "B", "A"),
+    ("vehicle", "pilots"): ("_PersonToVehicle", "B", "A"),
+    ("vehicle", "films"): ("_FilmToVehicle", "B", "A"),
+    ("starship", "pilots"): ("_PersonToStarship", "B", "A"),
+    ("starship", "films"): ("_FilmToStarship", "B", "A"),
+}
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+class SQLiteTable:
+    """Hand written queries for a table, see `swapi.data_access.base.Table`.
+
+    Pages are found with keyset pagination on the primary key, so the cost
+    doesn't depend on the position of the page.
+    """
+
+    def __init__(
+        self,
+        client: "SQLiteClient",
+        table_name: str,
+        columns: list[str],
+        datetime_columns: set[str],
+    ):
+        self.client = client
+        self.table_name = table_name
+        self.model = MODELS[table_name]
+        self.columns = columns
+        self.datetime_columns = datetime_columns
+
+    def _get_columns(
+        self, columns: Collection[str] | None, *required: str
+    ) -> list[str]:
+        """Returns the columns to select, in the order of the table: `id`, the
+        `required` ones and `columns`, or all of them when it's `None`."""
+
+        if columns is None:
+            return self.columns
+
+        selected = {"id", *required, *columns}
+
+        if not selected.issubset(self.columns):
+            unknown = ", ".join(sorted(selected.difference(self.columns)))
+
+            raise ValueError(f"Unknown columns {unknown} on {self.table_name}")
+
+        return [column for column in self.columns if column in selected]
+
+    def _select(self, columns: Sequence[str], *extra: str) -> str:
+        column_list = ", ".join([*extra, *(f't."{column}"' for column in columns)])
+
+        return f'SELECT {column_list} FROM "{self.model}" t'
+
+    def _to_row(self, columns: Sequence[str], values: Sequence[Any]) -> SimpleNamespace:
+        row = SimpleNamespace(**dict(zip(columns, values)))
+
+        for column in self.datetime_columns.intersection(columns):
+            # stored by Prisma as milliseconds since the epoch
+            value = getattr(row, column)
+
+            if value is not None:
+                setattr(row, column, EPOCH + datetime.timedelta(milliseconds=value))
+
+        return row
+
+    def _where(self, where: Mapping[str, Any] | None) -> tuple[list[str], list[Any]]:
+        conditions = []
+
+        for column in where or {}:
+            if column not in self.columns:
+                raise ValueError(f"Unknown column {column!r} on {self.table_name}")
+
+            conditions.append(f't."{column}" = ?')
+
+        return conditions, list((where or {}).values())
+
+    async def _fetch(self, sql: str, parameters: Iterable[Any] = ()) -> list[Any]:
+        return await self.client.fetch_all(sql, list(parameters))
+
+    async def find_by_ids(
+        self, ids: Sequence[int], columns: Collection[str] | None = None
+    ) -> list[Any]:
+        selected = self._get_columns(columns)
+        rows = await self._fetch(
+            f"{self._select(selected)} WHERE t.id IN ({_placeholders(ids)}) "
+            "ORDER BY t.id",
+            ids,
+        )
+
+        return [self._to_row(selected, values) for values in rows]
+
+    async def find_by_relation(
+        self,
+        relation: str,
+        parent_ids: Sequence[int] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[tuple[int, Any]]:
+        join_table, column, parent_column = JOIN_TABLES[(self.table_name, relation)]
+        selected = self._get_columns(columns)
+
+        sql = (
+            self._select(selected, f'j."{parent_column}"')
+            + f' JOIN "{join_table}" j ON j."{column}" = t.id'
+        )
+
+        if parent_ids is not None:
+            sql += f' WHERE j."{parent_column}" IN ({_placeholders(parent_ids)})'
+
+        rows = await self._fetch(
+            f'{sql} ORDER BY t.id, j."{parent_column}"', parent_ids or ()
+        )
+
+        return [(values[0], self._to_row(selected, values[1:])) for values in rows]
+
+    async def find_by_foreign_key(
+        self,
+        foreign_key: str,
+        parent_ids: Sequence[int],
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        if foreign_key not in self.columns:
+            raise ValueError(f"Unknown column {foreign_key!r} on {self.table_name}")
+
+        selected = self._get_columns(columns, foreign_key)
+        rows = await self._fetch(
+            f"{self._select(selected)} "
+            f'WHERE t."{foreign_key}" IN ({_placeholders(parent_ids)}) '
+            "ORDER BY t.id",
+            parent_ids,
+        )
+
+        return [self._to_row(selected, values) for values in rows]
+
+    async def find_page(
+        self,
+        cursor: int | None,
+        take: int,
+        skip: int,
+        where: Mapping[str, Any] | None = None,
+        columns: Collection[str] | None = None,
+    ) -> list[Any]:
+        conditions, parameters = self._where(where)
+        selected = self._get_columns(columns)
+        backwards = take < 0
+        limit = abs(take)
+
+        # as with Prisma, a cursor of 0 means no cursor
+        if cursor:
+            # the cursor row is fetched too, to check that it exists
+            conditions.append("t.id <= ?" if backwards else "t.id >= ?")
+            parameters.append(cursor)
+            limit += skip
+            offset = 0
+        else:
+            offset = skip
+
+        sql = self._select(selected)
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        sql += " ORDER BY t.id DESC" if backwards else " ORDER BY t.id"
+        sql += " LIMIT ? OFFSET ?"
+
+        rows = await self._fetch(sql, [*parameters, limit, offset])
+
+        if cursor:
+            if not rows or rows[0][selected.index("id")] != cursor:
+                return []
+
+            rows = rows[skip:]
+
+        if backwards:
+            rows.reverse()
+
+        return [self._to_row(selected, values) for values in rows]
+
+    async def find_all(self) -> list[Any]:
+        rows = await self._fetch(f"{self._select(self.columns)} ORDER BY t.id")
+
+        return [self._to_row(self.columns, values) for values in rows]
+
+    async def count(self, where: Mapping[str, Any] | None = None) -> int:
+        conditions, parameters = self._where(where)
+        sql = f'SELECT COUNT(*) FROM "{self.model}" t'
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        rows = await self._fetch(sql, parameters)
+
+        return rows[0][0]
+
+
+class SQLiteClient:
+    """Reads the dataset straight from the SQLite database, skipping Prisma's
+    query engine and its HTTP bridge.
+
+    The database is opened read-only by a pool of `pool_size` connections,
+    so that concurrent requests don't wait on each other. `immutable` tells
+    SQLite the file never changes, which skips locking altogether, but
+    changes made by `cli import_data` aren't seen until a restart.
+
+    The tables are available once connected, as their columns are read from
+    the database.
+    """
+
+    film: SQLiteTable
+    person: SQLiteTable
+    planet: SQLiteTable
+    species: SQLiteTable
+    vehicle: SQLiteTable
+    starship: SQLiteTable
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        *,
+        pool_size: int = 1,
+        immutable: bool = False,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size: int = 16 * 1024 * 1024,
+    ):
+        self.path = path
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.pool: Pool[aiosqlite.Connection] = Pool(
+            self._open_connection, self._close_connection, size=pool_size
+        )
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        uri = Path(self.path).absolute().as_uri()
+        uri += "?immutable=1" if self.immutable else "?mode=ro"
+
+        connection = await aiosqlite.connect(uri, uri=True)
+
+        await connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        # a negative size is in KiB instead of pages
+        await connection.execute(f"PRAGMA cache_size = {-int(self.cache_size // 1024)}")
+        await connection.execute("PRAGMA query_only = 1")
+
+        return connection
+
+    async def _close_connection(self, connection: aiosqlite.Connection) -> None:
+        await connection.close()
+
+    async def connect(self) -> None:
+        await self.pool.open()
+
+        for table_name, model in MODELS.items():
+            table_info = await self.fetch_all(f'PRAGMA table_info("{model}")')
+
+            setattr(
+                self,
+                table_name,
+                SQLiteTable(
+                    self,
+                    table_name,
+                    [name for _, name, *_ in table_info],
+                    {name for _, name, type_, *_ in table_info if type_ == "DATETIME"},
+                ),
+            )
+
+    async def disconnect(self) -> None:
+        await self.pool.close()
+
+    async def fetch_all(self, sql: str, parameters: Sequence[Any] = ()) -> list[Any]:
+        async with self.pool.acquire() as connection:
+            async with connection.execute(sql, parameters) as cursor:
+                return list(await cursor.fetchall())
+
+    def get_stats(self) -> dict[str, Any]:
+        return self.pool.get_stats()
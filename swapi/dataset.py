@@ -0,0 +1,16 @@
+import os
+from pathlib import Path
+
+
+# the database used by the datasource in schema.prisma
+DATABASE_PATH = Path(__file__).parent.parent / "db.sqlite3"
+
+
+def get_dataset_version() -> str:
+    """Returns a stamp of the data in the database, which changes whenever
+    the file is written, for example by `cli import_data`.
+    """
+
+    stat = os.stat(DATABASE_PATH)
+
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
@@ -0,0 +1,143 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from graphql import DocumentNode, GraphQLError
+
+from strawberry.extensions import SchemaExtension
+
+
+# measured on the queries in this repo, a parsed document takes between 20
+# and 45 bytes per character of query text
+AST_BYTES_PER_CHARACTER = 32
+
+
+@dataclass
+class CachedDocument:
+    document: DocumentNode
+    size: int
+    validation_errors: list[GraphQLError] | None = None
+
+
+@dataclass
+class DocumentCacheStore:
+    """Parsed documents and their validation errors by query text, evicting
+    the least recently used ones past `max_bytes`.
+
+    The size of an entry is estimated from the length of its query text.
+    """
+
+    max_bytes: int = 32 * 1024 * 1024
+
+    entries: OrderedDict[str, CachedDocument] = field(default_factory=OrderedDict)
+    size: int = 0
+    stats: dict[str, int] = field(
+        default_factory=lambda: {
+            "parse_hits": 0,
+            "parse_misses": 0,
+            "validation_hits": 0,
+            "validation_misses": 0,
+            "evictions": 0,
+        }
+    )
+
+    def get(self, query: str) -> CachedDocument | None:
+        entry = self.entries.get(query)
+
+        if entry is not None:
+            self.entries.move_to_end(query)
+
+        return entry
+
+    def set(self, query: str, document: DocumentNode) -> CachedDocument | None:
+        size = len(query) * (AST_BYTES_PER_CHARACTER + 1)
+
+        if size > self.max_bytes:
+            return None
+
+        entry = CachedDocument(document, size)
+
+        self.entries[query] = entry
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+            self.stats["evictions"] += 1
+
+        return entry
+
+    def get_stats(self) -> dict[str, Any]:
+        parse_total = self.stats["parse_hits"] + self.stats["parse_misses"]
+        validation_total = (
+            self.stats["validation_hits"] + self.stats["validation_misses"]
+        )
+
+        return {
+            **self.stats,
+            "parse_hit_rate": (
+                self.stats["parse_hits"] / parse_total if parse_total else None
+            ),
+            "validation_hit_rate": (
+                self.stats["validation_hits"] / validation_total
+                if validation_total
+                else None
+            ),
+            "entries": len(self.entries),
+            "bytes": self.size,
+        }
+
+
+class DocumentCache(SchemaExtension):
+    """Skips parsing and validation for query texts that have been seen
+    before, using a `DocumentCacheStore` shared by all the requests."""
+
+    def __init__(self, *, store: DocumentCacheStore):
+        self.store = store
+        self.entry: CachedDocument | None = None
+
+    def on_parse(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        query = execution_context.query
+
+        # the document might have been set already, by persisted queries
+        if not query or execution_context.graphql_document is not None:
+            yield
+            return
+
+        self.entry = self.store.get(query)
+
+        if self.entry is not None:
+            self.store.stats["parse_hits"] += 1
+            execution_context.graphql_document = self.entry.document
+
+            yield
+            return
+
+        self.store.stats["parse_misses"] += 1
+
+        yield
+
+        if execution_context.graphql_document is not None:
+            self.entry = self.store.set(query, execution_context.graphql_document)
+
+    def on_validate(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        entry = self.entry
+
+        if entry is None or execution_context.pre_execution_errors is not None:
+            yield
+            return
+
+        if entry.validation_errors is not None:
+            self.store.stats["validation_hits"] += 1
+            execution_context.pre_execution_errors = entry.validation_errors
+
+            yield
+            return
+
+        self.store.stats["validation_misses"] += 1
+
+        yield
+
+        entry.validation_errors = execution_context.pre_execution_errors
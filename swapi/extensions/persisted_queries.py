@@ -0,0 +1,100 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from graphql import DocumentNode, GraphQLError
+
+from strawberry.extensions import SchemaExtension
+
+
+@dataclass
+class PersistedQueryRegistry:
+    """Validated documents by the sha256 hash of their query text, evicting
+    the least recently used ones past `max_entries`."""
+
+    max_entries: int = 10_000
+
+    documents: OrderedDict[str, DocumentNode] = field(default_factory=OrderedDict)
+
+    def get(self, sha256_hash: str) -> DocumentNode | None:
+        document = self.documents.get(sha256_hash)
+
+        if document is not None:
+            self.documents.move_to_end(sha256_hash)
+
+        return document
+
+    def set(self, sha256_hash: str, document: DocumentNode) -> None:
+        self.documents[sha256_hash] = document
+        self.documents.move_to_end(sha256_hash)
+
+        while len(self.documents) > self.max_entries:
+            self.documents.popitem(last=False)
+
+
+class PersistedQueries(SchemaExtension):
+    """Implements Apollo's automatic persisted queries.
+
+    A request with a `persistedQuery` extension and no query is executed
+    with the document registered for its hash, without parsing nor
+    validating it again, or fails with `PersistedQueryNotFound` so that
+    the client sends the query along with the hash, which registers it.
+    """
+
+    def __init__(self, *, registry: PersistedQueryRegistry):
+        self.registry = registry
+        self.sha256_hash: str | None = None
+        self.is_registered = False
+
+    def on_operation(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        persisted_query = (execution_context.operation_extensions or {}).get(
+            "persistedQuery"
+        )
+
+        if isinstance(persisted_query, dict):
+            if persisted_query.get("version") != 1:
+                raise GraphQLError(
+                    "Unsupported persisted query version",
+                    extensions={"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+                )
+
+            self.sha256_hash = persisted_query.get("sha256Hash")
+            query = execution_context.query
+
+            if query and hashlib.sha256(query.encode()).hexdigest() != self.sha256_hash:
+                raise GraphQLError(
+                    "provided sha does not match query",
+                    extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"},
+                )
+
+            document = self.registry.get(self.sha256_hash or "")
+
+            if document is None and not query:
+                raise GraphQLError(
+                    "PersistedQueryNotFound",
+                    extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+                )
+
+            if document is not None:
+                execution_context.graphql_document = document
+                self.is_registered = True
+
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        if self.is_registered:
+            # registered documents have already been validated
+            self.execution_context.pre_execution_errors = []
+
+        yield
+
+        if (
+            self.sha256_hash
+            and not self.is_registered
+            and not self.execution_context.pre_execution_errors
+        ):
+            assert self.execution_context.graphql_document is not None
+
+            self.registry.set(self.sha256_hash, self.execution_context.graphql_document)
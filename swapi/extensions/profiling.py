@@ -0,0 +1,209 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Iterator
+
+from swapi.loaders import get_row_loader
+from swapi.recording import RecordingClient
+
+from graphql import GraphQLResolveInfo
+
+from strawberry.extensions import SchemaExtension
+
+
+# request header enabling the profile of a single request, which is then
+# returned in the `profile` key of the response extensions
+PROFILE_HEADER = "x-swapi-profile"
+
+# path of the resolver running in the current task, database calls are
+# attributed to it, for batched loaders it's the resolver starting the batch
+_current_path: ContextVar[str] = ContextVar("current_path", default="")
+
+
+def get_path(info: GraphQLResolveInfo) -> str:
+    """Returns the response path of the field without list indices, like
+    `allFilms.films.characterConnection`."""
+
+    return ".".join(key for key in info.path.as_list() if isinstance(key, str))
+
+
+@dataclass
+class Timings:
+    count: int = 0
+    duration: float = 0
+    db_calls: int = 0
+    db_duration: float = 0
+
+    def add(self, other: "Timings") -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.db_calls += other.db_calls
+        self.db_duration += other.db_duration
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "duration_ms": self.duration * 1000,
+            "db_calls": self.db_calls,
+            "db_duration_ms": self.db_duration * 1000,
+        }
+
+
+def _as_dict(
+    resolvers: dict[str, Timings], queries: dict[str, Timings]
+) -> dict[str, Any]:
+    return {
+        "resolvers": {path: timings.as_dict() for path, timings in resolvers.items()},
+        "queries": {
+            name: {"count": timings.count, "duration_ms": timings.duration * 1000}
+            for name, timings in queries.items()
+        },
+    }
+
+
+@dataclass
+class Profile:
+    """Timings of a single request, by resolver path and by database query
+    (like `film.find_page`)."""
+
+    duration: float = 0
+    resolvers: dict[str, Timings] = field(default_factory=dict)
+    queries: dict[str, Timings] = field(default_factory=dict)
+
+    def add_resolver(self, path: str, duration: float) -> None:
+        timings = self.resolvers.setdefault(path, Timings())
+        timings.count += 1
+        timings.duration += duration
+
+    def add_query(self, table_name: str, method: str, duration: float) -> None:
+        path = _current_path.get()
+
+        timings = self.resolvers.setdefault(path, Timings())
+        timings.db_calls += 1
+        timings.db_duration += duration
+
+        timings = self.queries.setdefault(f"{table_name}.{method}", Timings())
+        timings.count += 1
+        timings.duration += duration
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "duration_ms": self.duration * 1000,
+            **_as_dict(self.resolvers, self.queries),
+        }
+
+
+@dataclass
+class ProfileStore:
+    """Timings of all the profiled requests, by resolver path and database
+    query. Past `max_paths` distinct paths, new ones are counted under
+    `<other>`, as aliases make the number of paths unbounded."""
+
+    max_paths: int = 1000
+
+    requests: int = 0
+    duration: float = 0
+    resolvers: dict[str, Timings] = field(default_factory=dict)
+    queries: dict[str, Timings] = field(default_factory=dict)
+
+    def add(self, profile: Profile) -> None:
+        self.requests += 1
+        self.duration += profile.duration
+
+        for path, timings in profile.resolvers.items():
+            if path not in self.resolvers and len(self.resolvers) >= self.max_paths:
+                path = "<other>"
+
+            self.resolvers.setdefault(path, Timings()).add(timings)
+
+        for name, timings in profile.queries.items():
+            self.queries.setdefault(name, Timings()).add(timings)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "duration_ms": self.duration * 1000,
+            **_as_dict(self.resolvers, self.queries),
+        }
+
+
+class Profiling(SchemaExtension):
+    """Times the async resolvers, and the database queries they make, of the
+    requests sending the `X-Swapi-Profile: 1` header, or of every request
+    when `profile_all` is set.
+
+    The profile of a request is returned in its `profile` extension when it
+    was asked for with the header, and added to `store` in any case.
+    """
+
+    def __init__(self, *, store: ProfileStore, profile_all: bool = False):
+        self.store = store
+        self.profile_all = profile_all
+        self.profile: Profile | None = None
+        self.include_in_response = False
+
+    def on_operation(self) -> Iterator[None]:
+        context = self.execution_context.context
+        request = context.get("request") if isinstance(context, dict) else None
+
+        self.include_in_response = (
+            request is not None and request.headers.get(PROFILE_HEADER) == "1"
+        )
+
+        if not self.include_in_response and not self.profile_all:
+            yield
+            return
+
+        profile = self.profile = Profile()
+
+        # loaders are bound to the client, so they are recreated with the
+        # recording one, nothing has been loaded at this point
+        db = context["db"]
+        context["db"] = RecordingClient(db, profile.add_query)
+        context["row_loader"] = get_row_loader(context["db"], context["store"])
+
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            profile.duration = perf_counter() - start
+            context["db"] = db
+            self.store.add(profile)
+
+    def resolve(self, _next, root, info: GraphQLResolveInfo, *args, **kwargs):
+        if self.profile is None:
+            return _next(root, info, *args, **kwargs)
+
+        path = get_path(info)
+        token = _current_path.set(path)
+        start = perf_counter()
+
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            _current_path.reset(token)
+
+        # only the async resolvers load data, timing the others isn't useful
+        if isawaitable(result):
+            return self._await(result, path, start)
+
+        return result
+
+    async def _await(self, result: Any, path: str, start: float) -> Any:
+        assert self.profile is not None
+
+        token = _current_path.set(path)
+
+        try:
+            return await result
+        finally:
+            _current_path.reset(token)
+            self.profile.add_resolver(path, perf_counter() - start)
+
+    def get_results(self) -> dict[str, Any]:
+        if self.profile is None or not self.include_in_response:
+            return {}
+
+        return {"profile": self.profile.as_dict()}
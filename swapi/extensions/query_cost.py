@@ -0,0 +1,229 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from swapi.extensions.profiling import PROFILE_HEADER
+from swapi.utils.connections import DEFAULT_PAGE_SIZE
+
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    IntValueNode,
+    SelectionSetNode,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    is_composite_type,
+    is_list_type,
+    type_from_ast,
+    value_from_ast,
+)
+
+from strawberry.extensions import SchemaExtension
+
+
+def _is_connection(type_: Any) -> bool:
+    return isinstance(type_, GraphQLObjectType) and {"pageInfo", "edges"} <= set(
+        type_.fields
+    )
+
+
+def _get_page_size(node: FieldNode, variables: dict[str, Any]) -> int:
+    arguments: dict[str, Any] = {}
+
+    for argument in node.arguments or ():
+        value = argument.value
+
+        if isinstance(value, VariableNode):
+            arguments[argument.name.value] = variables.get(value.name.value)
+        elif isinstance(value, IntValueNode):
+            arguments[argument.name.value] = int(value.value)
+
+    first, last = arguments.get("first"), arguments.get("last")
+    page_size = first if isinstance(first, int) else last
+
+    if not isinstance(page_size, int):
+        return DEFAULT_PAGE_SIZE
+
+    return max(page_size, 0)
+
+
+@dataclass
+class _CostCalculator:
+    schema: GraphQLSchema
+    fragments: dict[str, FragmentDefinitionNode]
+    variables: dict[str, Any] = field(default_factory=dict)
+
+    def get_cost(
+        self,
+        selection_set: SelectionSetNode,
+        parent_type: Any,
+        multiplier: int,
+        page_size: int,
+    ) -> int:
+        cost = 0
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.get_field_cost(
+                    selection, parent_type, multiplier, page_size
+                )
+                continue
+
+            if isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+
+                if fragment is None:
+                    continue
+
+                type_condition = fragment.type_condition
+            else:
+                assert isinstance(selection, InlineFragmentNode)
+
+                fragment = selection
+                type_condition = fragment.type_condition
+
+            fragment_type = (
+                self.schema.get_type(type_condition.name.value)
+                if type_condition
+                else parent_type
+            )
+
+            cost += self.get_cost(
+                fragment.selection_set, fragment_type, multiplier, page_size
+            )
+
+        return cost
+
+    def get_field_cost(
+        self, node: FieldNode, parent_type: Any, multiplier: int, page_size: int
+    ) -> int:
+        # introspection fields aren't part of the parent type
+        field_definition = getattr(parent_type, "fields", {}).get(node.name.value)
+
+        if field_definition is None or node.selection_set is None:
+            return 0
+
+        field_type = get_named_type(field_definition.type)
+
+        if not is_composite_type(field_type):
+            return 0
+
+        if is_list_type(get_nullable_type(field_definition.type)):
+            multiplier *= page_size
+
+        if _is_connection(field_type):
+            page_size = _get_page_size(node, self.variables)
+
+        return multiplier + self.get_cost(
+            node.selection_set, field_type, multiplier, page_size
+        )
+
+
+def get_query_cost(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    operation_name: str | None = None,
+    variables: dict[str, Any] | None = None,
+) -> int:
+    """Returns the maximum number of objects the operation can return.
+
+    Each connection returns up to `first` or `last` items, or the default
+    page size, for each of its parents, so page sizes are multiplied down
+    nested connections. Scalars and introspection are free.
+    """
+
+    operation = get_operation_ast(document, operation_name)
+
+    if operation is None:
+        return 0
+
+    root_type = schema.get_root_type(operation.operation)
+    variables = dict(variables or {})
+
+    # variables left out by the client take their default value
+    for definition in operation.variable_definitions or ():
+        name = definition.variable.name.value
+
+        if name not in variables and definition.default_value is not None:
+            variables[name] = value_from_ast(
+                definition.default_value, type_from_ast(schema, definition.type)
+            )
+
+    calculator = _CostCalculator(
+        schema,
+        {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        },
+        variables,
+    )
+
+    return calculator.get_cost(operation.selection_set, root_type, 1, DEFAULT_PAGE_SIZE)
+
+
+class QueryCost(SchemaExtension):
+    """Rejects operations whose cost, see `get_query_cost`, is above
+    `max_cost`.
+
+    The cost is returned in the `cost` extension of rejected operations and
+    of the ones sending the profiling header, so that the other responses
+    stay the same as the reference API's.
+
+    The cost is computed right before execution, as validation is skipped
+    for persisted and cached documents.
+    """
+
+    def __init__(self, *, max_cost: int):
+        self.max_cost = max_cost
+        self.cost: int | None = None
+        self.include_in_response = False
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        document = execution_context.graphql_document
+        context = execution_context.context
+        request = context.get("request") if isinstance(context, dict) else None
+
+        self.include_in_response = (
+            request is not None and request.headers.get(PROFILE_HEADER) == "1"
+        )
+
+        if document is not None:
+            self.cost = get_query_cost(
+                execution_context.schema._schema,
+                document,
+                execution_context.operation_name,
+                execution_context.variables,
+            )
+
+            if self.cost > self.max_cost:
+                self.include_in_response = True
+
+                # setting the result skips the execution
+                execution_context.result = ExecutionResult(
+                    data=None,
+                    errors=[
+                        GraphQLError(
+                            f"Query cost of {self.cost} exceeds the maximum "
+                            f"cost of {self.max_cost}",
+                            extensions={"code": "QUERY_TOO_EXPENSIVE"},
+                        )
+                    ],
+                )
+
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        if self.cost is None or not self.include_in_response:
+            return {}
+
+        return {"cost": {"requested": self.cost, "maximum": self.max_cost}}
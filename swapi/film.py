@@ -1,5 +1,4 @@
-import json
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, ClassVar, Collection
 
 import prisma
 
@@ -11,7 +10,10 @@ from .planets import Planet, PlanetsEdge
 from .species import Species, SpeciesEdge
 from .starships import Starship, StarshipsEdge
 from .utils.connections import get_connection_resolver
-from .utils.datetime import format_datetime
+from .utils.datetime import format_date, format_datetime
+from .utils.lists import decode_list
+from .utils.rows import Columns, get_row_values
+from .utils.slots import add_slots
 from .vehicles import Vehicle, VehiclesEdge
 
 
@@ -81,35 +83,42 @@ class FilmCharactersConnection:
     characters: list[Annotated["Person", strawberry.lazy(".people")] | None] | None
 
 
+@add_slots
 @strawberry.type(description="A single film.")
 class Film(Node):
-    title: str | None = strawberry.field(description="The title of this film.")
+    title: str | None = strawberry.field(
+        description="The title of this film.", default=None
+    )
     episode_id: int | None = strawberry.field(
-        name="episodeID", description="The episode number of this film."
+        name="episodeID", description="The episode number of this film.", default=None
     )
     opening_crawl: str | None = strawberry.field(
-        description="The opening paragraphs at the beginning of this film."
+        description="The opening paragraphs at the beginning of this film.",
+        default=None,
     )
     director: str | None = strawberry.field(
-        description="The name of the director of this film."
+        description="The name of the director of this film.", default=None
     )
     producers: list[str | None] | None = strawberry.field(
-        description="The name(s) of the producer(s) of this film."
+        description="The name(s) of the producer(s) of this film.", default=None
     )
     release_date: str | None = strawberry.field(
         description=(
             "The ISO 8601 date format of film " "release at original creator country."
-        )
+        ),
+        default=None,
     )
     created: str | None = strawberry.field(
         description=(
             "The ISO 8601 date format of the time that " "this resource was created."
-        )
+        ),
+        default=None,
     )
     edited: str | None = strawberry.field(
         description=(
             "The ISO 8601 date format of the time that " "this resource was edited."
-        )
+        ),
+        default=None,
     )
 
     species_connection: FilmSpeciesConnection | None = strawberry.field(
@@ -119,9 +128,7 @@ class Film(Node):
             FilmSpeciesEdge,
             Species,
             attribute_name="species",
-            get_additional_filters=lambda root: {
-                "films": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="films",
         )
     )
 
@@ -132,9 +139,7 @@ class Film(Node):
             FilmStarshipsEdge,
             Starship,
             attribute_name="starships",
-            get_additional_filters=lambda root: {
-                "films": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="films",
         )
     )
 
@@ -145,9 +150,7 @@ class Film(Node):
             FilmVehiclesEdge,
             Vehicle,
             attribute_name="vehicles",
-            get_additional_filters=lambda root: {
-                "films": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="films",
         )
     )
 
@@ -158,9 +161,7 @@ class Film(Node):
             FilmPlanetsEdge,
             Planet,
             attribute_name="planets",
-            get_additional_filters=lambda root: {
-                "films": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="films",
         )
     )
 
@@ -171,24 +172,28 @@ class Film(Node):
             FilmCharactersEdge,
             "swapi.people.Person",
             attribute_name="characters",
-            get_additional_filters=lambda root: {
-                "films": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="films",
         )
     )
 
+    COLUMNS: ClassVar[Columns] = {
+        "title": None,
+        "episode_id": None,
+        "opening_crawl": None,
+        "director": None,
+        "producers": decode_list,
+        "release_date": format_date,
+        "created": format_datetime,
+        "edited": format_datetime,
+    }
+
     @classmethod
-    def from_row(cls, row: prisma.models.Film) -> "Film":
+    def from_row(
+        cls, row: prisma.models.Film, columns: Collection[str] | None = None
+    ) -> "Film":
         return cls(
             id=strawberry.ID(Node.get_global_id("films", row.id)),
-            title=row.title,
-            episode_id=row.episode_id,
-            opening_crawl=row.opening_crawl,
-            director=row.director,
-            producers=json.loads(row.producers),
-            release_date=row.release_date.date().isoformat(),
-            created=format_datetime(row.created),
-            edited=format_datetime(row.edited),
+            **get_row_values(row, cls.COLUMNS, columns),
         )
 
 
@@ -0,0 +1,58 @@
+import binascii
+from base64 import b64decode, b64encode
+from functools import lru_cache
+
+
+class InvalidGlobalIdError(ValueError):
+    """Raised for IDs and cursors that aren't a base64 encoded `type:id`, and
+    for row IDs that aren't a number, its message is returned to the client
+    as the error of the field."""
+
+
+@lru_cache(maxsize=65536)
+def to_global_id(type_name: str, id_: int | str) -> str:
+    """Returns the global ID of the row `id_` of `type_name`, used both as the
+    ID of nodes and as cursors. IDs are cached, as the same rows are returned
+    over and over again."""
+
+    return b64encode(f"{type_name}:{id_}".encode()).decode()
+
+
+@lru_cache(maxsize=4096)
+def from_global_id(global_id: str) -> tuple[str, int]:
+    """Returns the type name and the row id encoded in `global_id`."""
+
+    try:
+        decoded = b64decode(global_id, validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidGlobalIdError(
+            f"Invalid ID {global_id!r}, expected a base64 encoded type:id"
+        ) from None
+
+    type_name, _, id_part = decoded.partition(":")
+
+    if not type_name or not id_part.isascii() or not id_part.isdigit():
+        raise InvalidGlobalIdError(
+            f"Invalid ID {global_id!r}, {decoded!r} isn't a type:id pair"
+        )
+
+    return type_name, int(id_part)
+
+
+def from_row_id(row_id: str) -> int:
+    """Returns the row id sent in the `filmID` like arguments."""
+
+    if not row_id.isascii() or not row_id.isdigit():
+        raise InvalidGlobalIdError(f"Invalid ID {row_id!r}, expected a number")
+
+    return int(row_id)
+
+
+def from_cursor(cursor: str) -> int:
+    """Returns the row id of `cursor`.
+
+    Any type name is accepted, as clients can send the cursors of edges, the
+    IDs of nodes or the `arrayconnection` cursors of the reference API.
+    """
+
+    return from_global_id(cursor)[1]
@@ -0,0 +1,153 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Collection, Hashable, Mapping
+from functools import partial
+from typing import Any, Callable, Sequence
+
+from swapi.data_access.base import Client, Table
+from swapi.store import Store
+
+from strawberry.dataloader import DataLoader
+
+
+# (table name, row id, the columns needed or `None` for all of them)
+RowKey = tuple[str, int, frozenset[str] | None]
+
+
+async def load_by_ids(
+    table: Table, ids: Sequence[int], columns: Collection[str] | None = None
+) -> list[Any | None]:
+    """Loads the rows for `ids` from `table` with a single query.
+
+    The result follows the order of `ids`, with `None` for missing rows,
+    as required by DataLoader.
+    """
+
+    rows = await table.find_by_ids(ids, columns)
+    rows_by_id = {row.id: row for row in rows}
+
+    return [rows_by_id.get(id_) for id_ in ids]
+
+
+async def load_by_table_and_id(db: Client, keys: Sequence[RowKey]) -> list[Any | None]:
+    """Loads the rows for `(table_name, id, columns)` keys, with a single
+    query per table no matter how many ids are requested, selecting the
+    columns needed by all of them.
+    """
+
+    ids_by_table: dict[str, dict[int, None]] = defaultdict(dict)
+    columns_by_table: dict[str, set[str] | None] = {}
+
+    for table_name, id_, columns in keys:
+        ids_by_table[table_name][id_] = None
+
+        if columns is None:
+            columns_by_table[table_name] = None
+        elif (selected := columns_by_table.setdefault(table_name, set())) is not None:
+            selected.update(columns)
+
+    results = await asyncio.gather(
+        *(
+            load_by_ids(
+                getattr(db, table_name), list(ids), columns_by_table[table_name]
+            )
+            for table_name, ids in ids_by_table.items()
+        )
+    )
+
+    rows = {
+        (table_name, id_): row
+        for (table_name, ids), table_rows in zip(ids_by_table.items(), results)
+        for id_, row in zip(ids, table_rows)
+    }
+
+    return [rows[(table_name, id_)] for table_name, id_, _ in keys]
+
+
+async def load_by_relation(
+    table: Table,
+    relation: str,
+    parent_ids: Sequence[int],
+    columns: Collection[str] | None = None,
+) -> list[list[Any]]:
+    """Loads, for each parent id, the rows of `table` linked to it through the
+    list relation `relation`, with a single query for all the parents.
+    """
+
+    ids = list(parent_ids)
+    rows_by_parent: dict[int, list[Any]] = {id_: [] for id_ in ids}
+
+    for parent_id, row in await table.find_by_relation(relation, ids, columns):
+        rows_by_parent[parent_id].append(row)
+
+    return [rows_by_parent[id_] for id_ in ids]
+
+
+async def load_by_foreign_key(
+    table: Table,
+    foreign_key: str,
+    parent_ids: Sequence[int],
+    columns: Collection[str] | None = None,
+) -> list[list[Any]]:
+    """Loads, for each parent id, the rows of `table` whose `foreign_key`
+    column points to it, with a single query for all the parents.
+    """
+
+    ids = list(parent_ids)
+    rows = await table.find_by_foreign_key(foreign_key, ids, columns)
+
+    rows_by_parent: dict[int, list[Any]] = {id_: [] for id_ in ids}
+
+    for row in rows:
+        rows_by_parent[getattr(row, foreign_key)].append(row)
+
+    return [rows_by_parent[id_] for id_ in ids]
+
+
+async def load_from_store(
+    get_values: Callable[[Sequence[Any]], list[Any]], keys: Sequence[Any]
+) -> list[Any]:
+    return get_values(keys)
+
+
+def get_row_loader(db: Client, store: Store | None = None) -> DataLoader:
+    if store is not None:
+        return DataLoader(load_fn=partial(load_from_store, store.get_rows_by_id))
+
+    return DataLoader(load_fn=partial(load_by_table_and_id, db))
+
+
+def get_related_loader(
+    context: Mapping[str, Any],
+    table_name: str,
+    *,
+    relation: str | None = None,
+    foreign_key: str | None = None,
+    columns: frozenset[str] | None = None,
+) -> DataLoader:
+    """Returns the request's loader for the `columns` of the rows of
+    `table_name` related to a parent, creating it on first use.
+    """
+
+    loaders: dict[Hashable, DataLoader] = context["related_loaders"]
+    key = (table_name, relation, foreign_key, columns)
+
+    if key not in loaders:
+        table = getattr(context["db"], table_name)
+        store: Store | None = context["store"]
+
+        if store is not None:
+            load_fn = partial(
+                load_from_store,
+                partial(store.get_related_rows, table_name, relation or foreign_key),
+            )
+        elif relation is not None:
+            load_fn = partial(load_by_relation, table, relation, columns=columns)
+        else:
+            assert foreign_key is not None
+
+            load_fn = partial(load_by_foreign_key, table, foreign_key, columns=columns)
+
+        loaders[key] = DataLoader(load_fn=load_fn)
+
+    return loaders[key]
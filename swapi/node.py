@@ -1,15 +1,17 @@
-from base64 import b64decode, b64encode
-
 import strawberry
 
+from .global_ids import from_cursor, from_global_id, to_global_id
+from .utils.slots import add_slots
+
 
+@add_slots
 @strawberry.interface
 class Node:
     id: strawberry.ID
 
     @staticmethod
     def get_global_id(type_name: str, id: str | int) -> str:
-        return b64encode(f"{type_name}:{id}".encode()).decode()
+        return to_global_id(type_name, id)
 
     @staticmethod
     def get_id(obj: object) -> int:
@@ -19,4 +21,8 @@ class Node:
 
     @staticmethod
     def get_id_from_string(id_: str) -> int:
-        return int(b64decode(id_.encode()).decode().split(":")[1])
+        return from_cursor(id_)
+
+    @staticmethod
+    def get_type_and_id_from_string(id_: str) -> tuple[str, int]:
+        return from_global_id(id_)
@@ -1,3 +1,5 @@
+from typing import ClassVar, Collection
+
 import prisma
 from swapi.utils.datetime import format_datetime
 
@@ -12,6 +14,14 @@ from .planets import Planet
 from .species import Species
 from .starships import Starship, StarshipsEdge
 from .utils.connections import get_connection_resolver
+from .utils.rows import (
+    Columns,
+    get_node_from_row,
+    get_row_values,
+    get_selected_columns,
+)
+from .utils.selection import get_selected_field_names
+from .utils.slots import add_slots
 from .vehicles import Vehicle, VehiclesEdge
 
 
@@ -51,11 +61,12 @@ class PersonVehiclesConnection:
     vehicles: list[Vehicle | None] | None
 
 
+@add_slots
 @strawberry.type
 class Person(Node):
-    name: str | None
     homeworld_id: strawberry.Private[int]
     species_id: strawberry.Private[int | None]
+    name: str | None = None
     created: str | None = None
     edited: str | None = None
     gender: str | None = None
@@ -73,11 +84,7 @@ class Person(Node):
             FilmsEdge,
             Film,
             attribute_name="films",
-            get_additional_filters=lambda root: {
-                "characters": {
-                    "some": {"id": {"equals": Node.get_id(root)}},
-                },
-            },
+            relation="characters",
         )
     )
 
@@ -88,11 +95,7 @@ class Person(Node):
             StarshipsEdge,
             Starship,
             attribute_name="starships",
-            get_additional_filters=lambda root: {
-                "pilots": {
-                    "some": {"id": {"equals": Node.get_id(root)}},
-                },
-            },
+            relation="pilots",
         )
     )
 
@@ -103,11 +106,7 @@ class Person(Node):
             VehiclesEdge,
             Vehicle,
             attribute_name="vehicles",
-            get_additional_filters=lambda root: {
-                "pilots": {
-                    "some": {"id": {"equals": Node.get_id(root)}},
-                },
-            },
+            relation="pilots",
         )
     )
 
@@ -115,41 +114,53 @@ class Person(Node):
     async def homeworld(self, info: Info[Context, None]) -> Planet | None:
         from .planets import Planet
 
-        db = info.context["db"]
+        columns = get_selected_columns(Planet, get_selected_field_names(info))
+        planet = await info.context["row_loader"].load(
+            ("planet", self.homeworld_id, columns)
+        )
 
-        planet = await db.planet.find_first(where={"id": self.homeworld_id})
+        if planet is None:
+            return None
 
-        return Planet.from_row(planet) if planet is not None else None
+        return get_node_from_row(info.context["nodes"], Planet, planet, columns)
 
     @strawberry.field
     async def species(self, info: Info[Context, None]) -> Species | None:
         from .species import Species
 
-        db = info.context["db"]
-
         if self.species_id is None:
             return None
 
-        species = await db.species.find_first(where={"id": self.species_id})
+        columns = get_selected_columns(Species, get_selected_field_names(info))
+        species = await info.context["row_loader"].load(
+            ("species", self.species_id, columns)
+        )
+
+        if species is None:
+            return None
 
-        return Species.from_row(species) if species is not None else None
+        return get_node_from_row(info.context["nodes"], Species, species, columns)
+
+    COLUMNS: ClassVar[Columns] = {
+        "name": None,
+        "homeworld_id": None,
+        "species_id": None,
+        "gender": None,
+        "skin_color": None,
+        "hair_color": None,
+        "height": None,
+        "mass": None,
+        "eye_color": None,
+        "birth_year": None,
+        "created": format_datetime,
+        "edited": format_datetime,
+    }
 
     @staticmethod
-    def from_row(row: prisma.models.Person):
+    def from_row(row: prisma.models.Person, columns: Collection[str] | None = None):
         return Person(
             id=strawberry.ID(Node.get_global_id("people", row.id)),
-            name=row.name,
-            homeworld_id=row.homeworld_id,
-            species_id=row.species_id,
-            gender=row.gender,
-            skin_color=row.skin_color,
-            hair_color=row.hair_color,
-            height=row.height,
-            mass=row.mass,
-            eye_color=row.eye_color,
-            birth_year=row.birth_year,
-            created=format_datetime(row.created),
-            edited=format_datetime(row.edited),
+            **get_row_values(row, Person.COLUMNS, columns),
         )
 
 
@@ -1,5 +1,4 @@
-import json
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, ClassVar, Collection
 
 import prisma
 
@@ -9,6 +8,9 @@ from .node import Node
 from .page_info import PageInfo
 from .utils.connections import get_connection_resolver
 from .utils.datetime import format_datetime
+from .utils.lists import decode_list
+from .utils.rows import Columns, get_row_values
+from .utils.slots import add_slots
 
 
 if TYPE_CHECKING:
@@ -44,9 +46,10 @@ class PlanetFilmsConnection:
     films: list[Annotated["Film", strawberry.lazy(".film")] | None] | None
 
 
+@add_slots
 @strawberry.type
 class Planet(Node):
-    name: str | None
+    name: str | None = None
     created: str | None = None
     edited: str | None = None
     gravity: str | None = None
@@ -65,9 +68,7 @@ class Planet(Node):
             PlanetResidentsEdge,
             "swapi.people.Person",
             attribute_name="residents",
-            get_additional_filters=lambda root: {
-                "homeworld": {"id": Node.get_id(root)}
-            },
+            foreign_key="homeworld_id",
         )
     )
 
@@ -78,27 +79,31 @@ class Planet(Node):
             PlanetFilmsEdge,
             "swapi.film.Film",
             attribute_name="films",
-            get_additional_filters=lambda root: {
-                "planets": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="planets",
         )
     )
 
+    COLUMNS: ClassVar[Columns] = {
+        "name": None,
+        "gravity": None,
+        "surface_water": None,
+        "diameter": None,
+        "rotation_period": None,
+        "orbital_period": None,
+        "population": None,
+        "climates": decode_list,
+        "terrains": decode_list,
+        "edited": format_datetime,
+        "created": format_datetime,
+    }
+
     @staticmethod
-    def from_row(row: prisma.models.Planet) -> "Planet":
+    def from_row(
+        row: prisma.models.Planet, columns: Collection[str] | None = None
+    ) -> "Planet":
         return Planet(
             id=strawberry.ID(Node.get_global_id("planets", row.id)),
-            name=row.name,
-            gravity=row.gravity,
-            surface_water=row.surface_water,
-            diameter=row.diameter,
-            rotation_period=row.rotation_period,
-            orbital_period=row.orbital_period,
-            population=row.population,
-            climates=json.loads(row.climates),
-            terrains=json.loads(row.terrains),
-            edited=format_datetime(row.edited),
-            created=format_datetime(row.created),
+            **get_row_values(row, Planet.COLUMNS, columns),
         )
 
 
@@ -0,0 +1,51 @@
+import inspect
+from time import perf_counter
+from typing import Any, Callable
+
+
+# table name, method name, duration in seconds
+OnCall = Callable[[str, str, float], None]
+
+TABLE_NAMES = frozenset(["film", "person", "planet", "species", "vehicle", "starship"])
+
+
+class RecordingTable:
+    """Proxy of a table calling `on_call` after every query."""
+
+    def __init__(self, table: Any, table_name: str, on_call: OnCall):
+        self._table = table
+        self._table_name = table_name
+        self._on_call = on_call
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._table, name)
+
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        async def _call(*args, **kwargs):
+            start = perf_counter()
+
+            try:
+                return await attribute(*args, **kwargs)
+            finally:
+                self._on_call(self._table_name, name, perf_counter() - start)
+
+        return _call
+
+
+class RecordingClient:
+    """Proxy of a client recording the queries made through its tables,
+    for example `client.film.find_page(...)`."""
+
+    def __init__(self, client: Any, on_call: OnCall):
+        self._client = client
+        self._on_call = on_call
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+
+        if name in TABLE_NAMES:
+            return RecordingTable(attribute, name, self._on_call)
+
+        return attribute
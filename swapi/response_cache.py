@@ -0,0 +1,397 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from graphql import GraphQLError, parse, print_ast
+from graphql.language import ArgumentNode, ObjectFieldNode, Visitor, visit
+
+
+class _SortArguments(Visitor):
+    def leave(self, node, *args):
+        changes = {}
+
+        for attribute in ("arguments", "fields"):
+            values = getattr(node, attribute, None)
+
+            if values and isinstance(values[0], (ArgumentNode, ObjectFieldNode)):
+                changes[attribute] = tuple(
+                    sorted(values, key=lambda value: value.name.value)
+                )
+
+        if not changes:
+            return None
+
+        return node.__class__(
+            **{key: getattr(node, key) for key in node.keys} | changes
+        )
+
+
+@lru_cache(maxsize=1024)
+def normalize_document(query: str) -> str | None:
+    """Returns a canonical version of `query`, which doesn't depend on
+    whitespace, comments or the order of arguments.
+
+    Aliases are kept, as they change the shape of the response. Returns
+    `None` when the document can't be parsed.
+    """
+
+    try:
+        document = parse(query, no_location=True)
+    except GraphQLError:
+        return None
+
+    return print_ast(visit(document, _SortArguments()))
+
+
+@dataclass
+class CachedResponse:
+    version: str
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class ResponseCache:
+    """LRU cache of GraphQL responses, bounded by entries and bytes.
+
+    Entries are stored with the dataset version they were computed for, an
+    entry for an older version is either a miss or, when
+    `stale_while_revalidate` is set, served once while it's refreshed in
+    the background.
+    """
+
+    max_entries: int = 1024
+    max_bytes: int = 64 * 1024 * 1024
+    stale_while_revalidate: bool = False
+
+    entries: OrderedDict[str, CachedResponse] = field(default_factory=OrderedDict)
+    size: int = 0
+    stats: dict[str, int] = field(
+        default_factory=lambda: {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+    )
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self.entries.move_to_end(key)
+
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+
+        self.discard(key)
+
+        self.entries[key] = entry
+        self.size += len(entry.body)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.body)
+            self.stats["evictions"] += 1
+
+    def discard(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self.stats, "entries": len(self.entries), "bytes": self.size}
+
+
+def _get_request_params(scope: Scope, body: bytes) -> dict[str, Any] | None:
+    if scope["method"] == "GET":
+        params = {
+            key: values[0]
+            for key, values in parse_qs(scope["query_string"].decode()).items()
+        }
+
+        try:
+            params["variables"] = json.loads(params.get("variables") or "null")
+            params["extensions"] = json.loads(params.get("extensions") or "null")
+        except ValueError:
+            return None
+
+        return params
+
+    headers = dict(scope["headers"])
+
+    if not headers.get(b"content-type", b"").startswith(b"application/json"):
+        return None
+
+    try:
+        params = json.loads(body)
+    except ValueError:
+        return None
+
+    return params if isinstance(params, dict) else None
+
+
+def get_cache_key(params: dict[str, Any]) -> str | None:
+    query = params.get("query")
+    extensions = params.get("extensions")
+    persisted_query = (
+        extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+    )
+
+    if isinstance(query, str):
+        document = normalize_document(query)
+    elif isinstance(persisted_query, dict):
+        # automatic persisted query sent without its text
+        document = "persisted"
+    else:
+        return None
+
+    if document is None:
+        return None
+
+    # the whole persistedQuery object is part of the key, so that requests
+    # with a wrong hash or an unsupported version are executed, and get
+    # their error, instead of the response cached for a valid one
+    key = json.dumps(
+        [
+            document,
+            params.get("operationName"),
+            params.get("variables") or None,
+            persisted_query,
+        ],
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResponseCacheMiddleware:
+    """Serves repeated GraphQL queries on `path` from a `ResponseCache`.
+
+    Only successful JSON responses without errors are cached. `get_version`
+    returns the version of the data being served, so that entries computed
+    before a re-import are never served as fresh. Requests sending any of
+    `bypass_headers` with its value are neither served from nor stored in
+    the cache, and all of them are when the cache has no room (`max_entries`
+    is 0). Responses that can't be cached are streamed without being kept.
+
+    Stale entries are refreshed by background tasks, which are cancelled when
+    the app shuts down.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: ResponseCache,
+        get_version: Callable[[], str],
+        path: str = "/graphql",
+        bypass_headers: Mapping[str, str] | None = None,
+    ):
+        self.app = app
+        self.cache = cache
+        self.get_version = get_version
+        self.path = path
+        self.bypass_headers = {
+            (name.lower().encode(), value.encode())
+            for name, value in (bypass_headers or {}).items()
+        }
+        self.refreshing: set[str] = set()
+        # the event loop only keeps weak references to the tasks
+        self.refresh_tasks: set[asyncio.Task[None]] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.app(scope, self._receive_lifespan(receive), send)
+            return
+
+        if (
+            scope["type"] != "http"
+            or not self.cache.max_entries
+            or scope["path"].rstrip("/") != self.path
+            or scope["method"] not in ("GET", "POST")
+            or any(header in self.bypass_headers for header in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        params = _get_request_params(scope, body)
+        version = self.get_version()
+        key = get_cache_key(params) if params is not None else None
+
+        if key is None:
+            await self.app(scope, _replay(body, receive), send)
+            return
+
+        entry = self.cache.get(key)
+
+        if entry is not None and entry.version == version:
+            self.cache.stats["hits"] += 1
+            await _send_cached(entry, send, b"HIT")
+            return
+
+        if entry is not None and self.cache.stale_while_revalidate:
+            self.cache.stats["stale"] += 1
+
+            if key not in self.refreshing:
+                self.refreshing.add(key)
+                task = asyncio.create_task(
+                    self._refresh(dict(scope), body, key, version)
+                )
+                self.refresh_tasks.add(task)
+                task.add_done_callback(self.refresh_tasks.discard)
+
+            await _send_cached(entry, send, b"STALE")
+            return
+
+        self.cache.stats["misses"] += 1
+
+        await self._execute(scope, body, key, version, send, receive)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        body: bytes,
+        key: str,
+        version: str,
+        send: Send | None = None,
+        receive: Receive | None = None,
+    ) -> None:
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        size = 0
+        # only known once the response starts, then cleared as soon as the
+        # body can't be cached, so that streamed responses (like the
+        # multipart ones of @defer and @stream) aren't kept in memory
+        cacheable = False
+
+        async def capture(message: Message) -> None:
+            nonlocal headers, size, cacheable
+
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                ]
+                content_type = dict(headers).get(b"content-type", b"")
+                cacheable = message["status"] == 200 and content_type.startswith(
+                    b"application/json"
+                )
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"x-cache", b"MISS")],
+                }
+            elif message["type"] == "http.response.body" and cacheable:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+
+                if size > self.cache.max_bytes:
+                    cacheable = False
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+
+            if send is not None:
+                await send(message)
+
+        await self.app(scope, _replay(body, receive), capture)
+
+        if not cacheable:
+            return
+
+        response_body = b"".join(chunks)
+
+        try:
+            result = json.loads(response_body)
+        except ValueError:
+            return
+
+        if isinstance(result, dict) and not result.get("errors"):
+            self.cache.set(key, CachedResponse(version, 200, headers, response_body))
+
+    async def _refresh(self, scope: Scope, body: bytes, key: str, version: str):
+        try:
+            await self._execute(scope, body, key, version)
+        finally:
+            self.refreshing.discard(key)
+
+    async def close(self) -> None:
+        """Cancels the refreshes still running and waits for them to stop."""
+
+        tasks = list(self.refresh_tasks)
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _receive_lifespan(self, receive: Receive) -> Receive:
+        async def receive_lifespan() -> Message:
+            message = await receive()
+
+            # before the shutdown handlers of the app close the database
+            if message["type"] == "lifespan.shutdown":
+                await self.close()
+
+            return message
+
+        return receive_lifespan
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay(body: bytes, receive: Receive | None = None) -> Receive:
+    """Returns a `Receive` sending the already read `body` again, and then
+    the messages of `receive`, so that streaming responses (like the ones of
+    @defer and @stream) see when the client disconnects instead of stopping
+    right away. Without `receive`, the client is considered disconnected.
+    """
+
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+
+        if sent:
+            if receive is not None:
+                return await receive()
+
+            return {"type": "http.disconnect"}
+
+        sent = True
+
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+async def _send_cached(entry: CachedResponse, send: Send, status: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": [
+                *entry.headers,
+                (b"content-length", str(len(entry.body)).encode()),
+                (b"x-cache", status),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": entry.body})
@@ -0,0 +1,88 @@
+import fcntl
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from .data_access.base import FOREIGN_KEYS
+from .data_access.sqlite_client import MODELS
+from .dataset import DATABASE_PATH, get_dataset_version
+
+
+# where the snapshots of the database are built, one per dataset version
+SNAPSHOT_DIRECTORY = Path(
+    os.environ.get("SWAPI_SNAPSHOT_DIRECTORY", DATABASE_PATH.parent / ".snapshots")
+)
+
+
+def build_snapshot(source: Path, destination: Path) -> None:
+    """Copies the database at `source` to `destination`, adding the indexes
+    used by `SQLiteClient` and the statistics of the query planner.
+
+    The snapshot is only read afterwards, so it's also compacted.
+    """
+
+    # using a connection as a context manager only ends its transaction
+    with (
+        closing(
+            sqlite3.connect(f"{source.absolute().as_uri()}?mode=ro", uri=True)
+        ) as db,
+        closing(sqlite3.connect(destination)) as snapshot,
+    ):
+        db.backup(snapshot)
+
+    snapshot = sqlite3.connect(destination)
+
+    try:
+        for table_name, foreign_keys in FOREIGN_KEYS.items():
+            model = MODELS[table_name]
+
+            for foreign_key in foreign_keys:
+                snapshot.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{model}_{foreign_key}_index" '
+                    f'ON "{model}" ("{foreign_key}")'
+                )
+
+        snapshot.execute("ANALYZE")
+        snapshot.commit()
+        snapshot.execute("VACUUM")
+    finally:
+        snapshot.close()
+
+
+def ensure_snapshot(directory: Path = SNAPSHOT_DIRECTORY) -> tuple[Path, str]:
+    """Returns the path and version of the snapshot of the current dataset,
+    building it first if needed.
+
+    When several workers start together, the first one to take the lock
+    builds the snapshot while the others wait, and then use it. Snapshots
+    of older versions are removed, workers still using them keep their
+    open file until they restart.
+    """
+
+    version = get_dataset_version()
+    path = directory / f"db-{version}.sqlite3"
+
+    if path.exists():
+        return path, version
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with open(directory / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        try:
+            if not path.exists():
+                temporary_path = path.with_suffix(".tmp")
+                temporary_path.unlink(missing_ok=True)
+
+                build_snapshot(DATABASE_PATH, temporary_path)
+                os.replace(temporary_path, path)
+
+                for previous in directory.glob("db-*.sqlite3"):
+                    if previous != path:
+                        previous.unlink(missing_ok=True)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    return path, version
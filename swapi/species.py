@@ -1,5 +1,4 @@
-import json
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, ClassVar, Collection
 
 import prisma
 
@@ -12,6 +11,15 @@ from .page_info import PageInfo
 from .planets import Planet
 from .utils.connections import get_connection_resolver
 from .utils.datetime import format_datetime
+from .utils.lists import decode_list
+from .utils.rows import (
+    Columns,
+    get_node_from_row,
+    get_row_values,
+    get_selected_columns,
+)
+from .utils.selection import get_selected_field_names
+from .utils.slots import add_slots
 
 
 if TYPE_CHECKING:
@@ -47,11 +55,12 @@ class SpeciesFilmsConnection:
     films: list[Annotated["Film", strawberry.lazy(".film")] | None] | None
 
 
+@add_slots
 @strawberry.type
 class Species(Node):
     id: strawberry.ID
-    name: str | None
     homeworld_id: strawberry.Private[int | None]
+    name: str | None = None
     created: str | None = None
     edited: str | None = None
     classification: str | None = None
@@ -67,14 +76,18 @@ class Species(Node):
     async def homeworld(self, info: Info[Context, None]) -> Planet | None:
         from .planets import Planet
 
-        db = info.context["db"]
-
         if self.homeworld_id is None:
             return None
 
-        planet = await db.planet.find_first(where={"id": self.homeworld_id})
+        columns = get_selected_columns(Planet, get_selected_field_names(info))
+        planet = await info.context["row_loader"].load(
+            ("planet", self.homeworld_id, columns)
+        )
 
-        return Planet.from_row(planet) if planet is not None else None
+        if planet is None:
+            return None
+
+        return get_node_from_row(info.context["nodes"], Planet, planet, columns)
 
     person_connection: SpeciesPeopleConnection | None = strawberry.field(
         resolver=get_connection_resolver(
@@ -83,7 +96,7 @@ class Species(Node):
             SpeciesPeopleEdge,
             "swapi.people.Person",
             attribute_name="people",
-            get_additional_filters=lambda root: {"species": {"id": Node.get_id(root)}},
+            foreign_key="species_id",
         )
     )
 
@@ -94,28 +107,32 @@ class Species(Node):
             SpeciesFilmsEdge,
             "swapi.film.Film",
             attribute_name="films",
-            get_additional_filters=lambda root: {
-                "species": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="species",
         )
     )
 
+    COLUMNS: ClassVar[Columns] = {
+        "homeworld_id": None,
+        "name": None,
+        "designation": None,
+        "classification": None,
+        "eye_colors": decode_list,
+        "skin_colors": decode_list,
+        "hair_colors": decode_list,
+        "language": None,
+        "average_lifespan": None,
+        "average_height": None,
+        "created": format_datetime,
+        "edited": format_datetime,
+    }
+
     @classmethod
-    def from_row(cls, row: prisma.models.Species) -> "Species":
+    def from_row(
+        cls, row: prisma.models.Species, columns: Collection[str] | None = None
+    ) -> "Species":
         return cls(
             id=strawberry.ID(Node.get_global_id("species", row.id)),
-            homeworld_id=row.homeworld_id,
-            name=row.name,
-            designation=row.designation,
-            classification=row.classification,
-            eye_colors=json.loads(row.eye_colors),
-            skin_colors=json.loads(row.skin_colors),
-            hair_colors=json.loads(row.hair_colors),
-            language=row.language,
-            average_lifespan=row.average_lifespan,
-            average_height=row.average_height,
-            created=format_datetime(row.created),
-            edited=format_datetime(row.edited),
+            **get_row_values(row, cls.COLUMNS, columns),
         )
 
 
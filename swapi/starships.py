@@ -1,5 +1,4 @@
-import json
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, ClassVar, Collection
 
 import prisma
 
@@ -9,6 +8,9 @@ from .node import Node
 from .page_info import PageInfo
 from .utils.connections import get_connection_resolver
 from .utils.datetime import format_datetime
+from .utils.lists import decode_list
+from .utils.rows import Columns, get_row_values
+from .utils.slots import add_slots
 
 
 if TYPE_CHECKING:
@@ -44,9 +46,10 @@ class StarshipFilmsConnection:
     films: list[Annotated["Film", strawberry.lazy(".film")] | None] | None
 
 
+@add_slots
 @strawberry.type
 class Starship(Node):
-    name: str | None
+    name: str | None = None
     created: str | None = None
     edited: str | None = None
     model: str | None = None
@@ -69,9 +72,7 @@ class Starship(Node):
             StarshipPilotsEdge,
             "swapi.people.Person",
             attribute_name="pilots",
-            get_additional_filters=lambda root: {
-                "starships": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="starships",
         )
     )
 
@@ -82,31 +83,35 @@ class Starship(Node):
             StarshipFilmsEdge,
             "swapi.film.Film",
             attribute_name="films",
-            get_additional_filters=lambda root: {
-                "starships": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="starships",
         )
     )
 
+    COLUMNS: ClassVar[Columns] = {
+        "name": None,
+        "created": format_datetime,
+        "edited": format_datetime,
+        "model": None,
+        "cost_in_credits": None,
+        "length": None,
+        "max_atmosphering_speed": None,
+        "hyperdrive_rating": None,
+        "crew": None,
+        "passengers": None,
+        "cargo_capacity": None,
+        "manufacturers": decode_list,
+        "consumables": None,
+        "MGLT": None,
+        "starship_class": None,
+    }
+
     @staticmethod
-    def from_row(row: prisma.models.Starship) -> "Starship":
+    def from_row(
+        row: prisma.models.Starship, columns: Collection[str] | None = None
+    ) -> "Starship":
         return Starship(
             id=strawberry.ID(Node.get_global_id("starships", row.id)),
-            name=row.name,
-            created=format_datetime(row.created),
-            edited=format_datetime(row.edited),
-            model=row.model,
-            cost_in_credits=row.cost_in_credits,
-            length=row.length,
-            max_atmosphering_speed=row.max_atmosphering_speed,
-            hyperdrive_rating=row.hyperdrive_rating,
-            crew=row.crew,
-            passengers=row.passengers,
-            cargo_capacity=row.cargo_capacity,
-            manufacturers=json.loads(row.manufacturers),
-            consumables=row.consumables,
-            MGLT=row.MGLT,
-            starship_class=row.starship_class,
+            **get_row_values(row, Starship.COLUMNS, columns),
         )
 
 
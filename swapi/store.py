@@ -0,0 +1,117 @@
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+from .data_access.base import FOREIGN_KEYS, RELATIONS, Client
+from .dataset import get_dataset_version
+
+
+class RelatedRows(Sequence[Any]):
+    """Rows related to a parent, backed by a sorted array of their ids."""
+
+    __slots__ = ("ids", "rows_by_id")
+
+    def __init__(self, ids: Sequence[int], rows_by_id: Mapping[int, Any]):
+        self.ids = ids
+        self.rows_by_id = rows_by_id
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self.rows_by_id[id_] for id_ in self.ids[index]]
+
+        return self.rows_by_id[self.ids[index]]
+
+
+class RelationIndex:
+    """Sorted ids of the rows related to each parent id, for one relation.
+
+    The number of related rows is the length of the array, and a page of
+    them is found with a binary search followed by a slice.
+    """
+
+    __slots__ = ("ids_by_parent", "rows_by_id")
+
+    EMPTY = array("q")
+
+    def __init__(
+        self, pairs: Iterable[tuple[int | None, Any]], rows_by_id: dict[int, Any]
+    ):
+        ids_by_parent: dict[int, list[int]] = defaultdict(list)
+
+        for parent_id, row in pairs:
+            if parent_id is not None:
+                ids_by_parent[parent_id].append(row.id)
+
+        self.ids_by_parent = {
+            parent_id: array("q", sorted(ids))
+            for parent_id, ids in ids_by_parent.items()
+        }
+        self.rows_by_id = rows_by_id
+
+    def get(self, parent_id: int) -> RelatedRows:
+        return RelatedRows(
+            self.ids_by_parent.get(parent_id, self.EMPTY), self.rows_by_id
+        )
+
+
+@dataclass
+class Store:
+    """Read-only copy of the whole dataset, used to serve requests without
+    going through the database.
+
+    The data only changes when running `cli import_data`, so it's loaded once
+    at startup, see `app.startup`.
+    """
+
+    # version of the dataset when it was loaded
+    version: str = ""
+    # table name -> rows sorted by id
+    rows: dict[str, list[Any]] = field(default_factory=dict)
+    # table name -> id -> row
+    rows_by_id: dict[str, dict[int, Any]] = field(default_factory=dict)
+    # (table name, relation or foreign key) -> index of the related rows
+    relations: dict[Hashable, RelationIndex] = field(default_factory=dict)
+
+    @classmethod
+    async def load(cls, db: Client) -> "Store":
+        store = cls(version=get_dataset_version())
+
+        for table_name, relations in RELATIONS.items():
+            table = getattr(db, table_name)
+            rows = await table.find_all()
+
+            rows_by_id = {row.id: row for row in rows}
+
+            store.rows[table_name] = rows
+            store.rows_by_id[table_name] = rows_by_id
+
+            for relation in relations:
+                store.relations[(table_name, relation)] = RelationIndex(
+                    await table.find_by_relation(relation), rows_by_id
+                )
+
+            for foreign_key in FOREIGN_KEYS.get(table_name, []):
+                store.relations[(table_name, foreign_key)] = RelationIndex(
+                    ((getattr(row, foreign_key), row) for row in rows), rows_by_id
+                )
+
+        return store
+
+    def get_rows(self, table_name: str) -> list[Any]:
+        return self.rows[table_name]
+
+    def get_related_rows(
+        self, table_name: str, key: str, parent_ids: Sequence[int]
+    ) -> list[RelatedRows]:
+        index = self.relations[(table_name, key)]
+
+        return [index.get(id_) for id_ in parent_ids]
+
+    def get_rows_by_id(self, keys: Sequence[tuple[str, int, Any]]) -> list[Any | None]:
+        # the rows are loaded with all their columns
+        return [self.rows_by_id[table_name].get(id_) for table_name, id_, _ in keys]
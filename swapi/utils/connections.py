@@ -1,12 +1,23 @@
 import importlib
-from typing import Any, Callable, cast
+from bisect import bisect_left
+from typing import Any, Callable, Collection, Sequence, cast
 
 from swapi.context import Context
+from swapi.data_access.base import Table
+from swapi.global_ids import from_cursor, to_global_id
+from swapi.loaders import get_related_loader
 from swapi.node import Node
 from swapi.page_info import PageInfo
+from swapi.utils.rows import NodeMap, get_node_from_row, get_selected_columns
+from swapi.utils.selection import get_selected_field_names
 
 import strawberry
 from strawberry.types.info import Info
+from strawberry.utils.str_converters import to_camel_case
+
+
+# page size when neither `first` nor `last` are passed
+DEFAULT_PAGE_SIZE = 30
 
 
 def get_connection_resolver(
@@ -16,7 +27,19 @@ def get_connection_resolver(
     NodeType: type | str,
     attribute_name: str,
     get_additional_filters: Callable[[object], dict[str, Any]] = lambda root: {},
+    relation: str | None = None,
+    foreign_key: str | None = None,
 ) -> Callable:
+    """Returns a resolver for a connection over `table_name`.
+
+    Nested connections should pass either `relation` (the name of the list
+    relation on `table_name` pointing back to the parent type) or
+    `foreign_key` (the column on `table_name` holding the parent id). The
+    rows for all the sibling parents are then loaded together, with one
+    query per connection field, instead of one count and one page query
+    per parent.
+    """
+
     async def _resolve(
         root,
         info: Info[Context, None],
@@ -34,8 +57,55 @@ def get_connection_resolver(
             NodeType = cast(type, NodeType)
 
         db = info.context["db"]
+        selection = get_selected_field_names(info)
+        columns = get_selected_columns(
+            NodeType,
+            get_selected_field_names(info, "edges", "node")
+            | get_selected_field_names(info, to_camel_case(attribute_name)),
+        )
+
+        if relation is not None or foreign_key is not None:
+            loader = get_related_loader(
+                info.context,
+                table_name,
+                relation=relation,
+                foreign_key=foreign_key,
+                columns=columns,
+            )
+
+            return get_connection_object_from_rows(
+                await loader.load(Node.get_id(root)),
+                ConnectionType,
+                EdgeType,
+                NodeType,
+                after=after,
+                first=first,
+                before=before,
+                last=last,
+                attribute_name=attribute_name,
+                selection=selection,
+                columns=columns,
+                nodes=info.context["nodes"],
+            )
 
         additional_filters = get_additional_filters(root)
+        store = info.context["store"]
+
+        if store is not None and not additional_filters:
+            return get_connection_object_from_rows(
+                store.get_rows(table_name),
+                ConnectionType,
+                EdgeType,
+                NodeType,
+                after=after,
+                first=first,
+                before=before,
+                last=last,
+                attribute_name=attribute_name,
+                selection=selection,
+                columns=columns,
+                nodes=info.context["nodes"],
+            )
 
         return await get_connection_object(
             getattr(db, table_name),
@@ -48,38 +118,33 @@ def get_connection_resolver(
             last=last,
             attribute_name=attribute_name,
             additional_filters=additional_filters,
+            selection=selection,
+            columns=columns,
+            nodes=info.context["nodes"],
         )
 
     return _resolve
 
 
-async def get_connection_object(
-    table: Any,
-    ConnectionType: type,
-    EdgeType: type,
-    NodeType: type,
-    *,
-    after: str | None = strawberry.UNSET,
-    before: str | None = strawberry.UNSET,
-    first: int | None = strawberry.UNSET,
-    last: int | None = strawberry.UNSET,
-    attribute_name: str | None = None,
-    additional_filters: dict[str, Any] | None = None,
-):
-    """Returns a ConnectionType instance based on EdgeType and the passed params.
+def _get_page_arguments(
+    after: str | None,
+    before: str | None,
+    first: int | None,
+    last: int | None,
+) -> tuple[int | None, int, int, int | None, int | None]:
+    """Converts the Relay arguments into prisma's `cursor`, `take` and `skip`.
 
-    This is based on the Relay Connection specification, see it here:
-    https://facebook.github.io/relay/graphql/connections.htm
+    Returns `(cursor, take, skip, first, last)`, where `first` and `last`
+    have the default page size applied.
     """
 
     after = after if after is not strawberry.UNSET else None
     before = before if before is not strawberry.UNSET else None
     first = first if first is not strawberry.UNSET else None
     last = last if last is not strawberry.UNSET else None
-    additional_filters = additional_filters or {}
 
     if first is None and last is None:
-        first = 30
+        first = DEFAULT_PAGE_SIZE
 
     take = first
     cursor = after
@@ -92,21 +157,70 @@ async def get_connection_object(
     else:
         take = take + 1
 
-    if cursor is not None:
-        cursor = Node.get_id_from_string(cursor)
+    cursor_id = from_cursor(cursor) if cursor is not None else None
 
     # prisma includes the cursor in the result set, so we need to skip it
-    skip = 1 if cursor is not None else 0
-
-    count = await table.count(where=additional_filters)
-    data = await table.find_many(
-        cursor={"id": cursor} if cursor else None,
-        take=take,
-        skip=skip,
-        where=additional_filters,
-        order={"id": "asc"},
-    )
+    skip = 1 if cursor_id is not None else 0
+
+    return cursor_id, take, skip, first, last
+
+
+def _slice_rows(
+    rows: Sequence[Any], cursor: int | None, take: int, skip: int
+) -> list[Any]:
+    """Applies prisma's cursor pagination to `rows`, which are sorted by id.
+
+    The cursor is found with a binary search, so the cost doesn't depend on
+    the number of rows.
+    """
+
+    if cursor:
+        index = bisect_left(rows, cursor, key=lambda row: row.id)
+
+        if index == len(rows) or rows[index].id != cursor:
+            return []
+    else:
+        index = None
+
+    if take >= 0:
+        start = (index or 0) + skip
+
+        return list(rows[start : start + take])
+
+    end = (index + 1 if index is not None else len(rows)) - skip
 
+    return list(rows[max(end + take, 0) : max(end, 0)])
+
+
+def _is_selected(selection: Collection[str] | None, *field_names: str) -> bool:
+    """`selection` is `None` when the caller doesn't know which fields are
+    selected, in which case everything is resolved."""
+
+    return selection is None or any(name in selection for name in field_names)
+
+
+def _needs_rows(selection: Collection[str] | None, attribute_name: str | None) -> bool:
+    node_fields = ["pageInfo", "edges"]
+
+    if attribute_name:
+        node_fields.append(to_camel_case(attribute_name))
+
+    return _is_selected(selection, *node_fields)
+
+
+def _build_connection(
+    data: list[Any],
+    count: int | None,
+    ConnectionType: type,
+    EdgeType: type,
+    NodeType: type,
+    first: int | None,
+    last: int | None,
+    attribute_name: str | None,
+    selection: Collection[str] | None,
+    columns: Collection[str] | None,
+    nodes: NodeMap | None,
+):
     has_next_page = first is not None and len(data) > first
     has_previous_page = last is not None and len(data) > last
 
@@ -117,17 +231,26 @@ async def get_connection_object(
         data = data[1:]
 
     if len(data) > 0:
-        start_cursor = Node.get_global_id(EdgeType.__name__, data[0].id)
-        end_cursor = Node.get_global_id(EdgeType.__name__, data[-1].id)
+        start_cursor = to_global_id(EdgeType.__name__, data[0].id)
+        end_cursor = to_global_id(EdgeType.__name__, data[-1].id)
     else:
         start_cursor = None
         end_cursor = None
 
-    nodes = [NodeType.from_row(row) for row in data]  # type: ignore
+    needs_edges = _is_selected(selection, "edges")
+    needs_nodes = attribute_name is not None and _is_selected(
+        selection, to_camel_case(attribute_name)
+    )
+
+    nodes = (
+        [get_node_from_row(nodes, NodeType, row, columns) for row in data]
+        if needs_edges or needs_nodes
+        else []
+    )
 
     kwargs = (
         {
-            attribute_name: nodes,
+            attribute_name: nodes if needs_nodes else None,
         }
         if attribute_name
         else {}
@@ -140,7 +263,105 @@ async def get_connection_object(
             start_cursor=start_cursor,
             end_cursor=end_cursor,
         ),
-        edges=[EdgeType(node=node, cursor=node.id) for node in nodes],
+        edges=(
+            [EdgeType(node=node, cursor=node.id) for node in nodes]
+            if needs_edges
+            else None
+        ),
         total_count=count,
         **kwargs,
     )
+
+
+async def get_connection_object(
+    table: Table,
+    ConnectionType: type,
+    EdgeType: type,
+    NodeType: type,
+    *,
+    after: str | None = strawberry.UNSET,
+    before: str | None = strawberry.UNSET,
+    first: int | None = strawberry.UNSET,
+    last: int | None = strawberry.UNSET,
+    attribute_name: str | None = None,
+    additional_filters: dict[str, Any] | None = None,
+    selection: Collection[str] | None = None,
+    columns: Collection[str] | None = None,
+    nodes: NodeMap | None = None,
+):
+    """Returns a ConnectionType instance based on EdgeType and the passed params.
+
+    This is based on the Relay Connection specification, see it here:
+    https://facebook.github.io/relay/graphql/connections.htm
+
+    `selection` holds the names of the fields selected on the connection,
+    queries and objects only needed by unselected fields are skipped.
+    `columns` is the projection passed to `find_page` and `NodeType.from_row`,
+    and `nodes` the nodes already built during the request, see
+    `get_node_from_row`.
+    """
+
+    additional_filters = additional_filters or {}
+
+    cursor, take, skip, first, last = _get_page_arguments(after, before, first, last)
+
+    count = (
+        await table.count(additional_filters)
+        if _is_selected(selection, "totalCount")
+        else None
+    )
+    data = (
+        await table.find_page(cursor, take, skip, additional_filters, columns)
+        if _needs_rows(selection, attribute_name)
+        else []
+    )
+
+    return _build_connection(
+        data,
+        count,
+        ConnectionType,
+        EdgeType,
+        NodeType,
+        first,
+        last,
+        attribute_name,
+        selection,
+        columns,
+        nodes,
+    )
+
+
+def get_connection_object_from_rows(
+    rows: Sequence[Any],
+    ConnectionType: type,
+    EdgeType: type,
+    NodeType: type,
+    *,
+    after: str | None = strawberry.UNSET,
+    before: str | None = strawberry.UNSET,
+    first: int | None = strawberry.UNSET,
+    last: int | None = strawberry.UNSET,
+    attribute_name: str | None = None,
+    selection: Collection[str] | None = None,
+    columns: Collection[str] | None = None,
+    nodes: NodeMap | None = None,
+):
+    """Same as `get_connection_object`, but paginates rows that are already
+    loaded (sorted by id) instead of querying the database.
+    """
+
+    cursor, take, skip, first, last = _get_page_arguments(after, before, first, last)
+
+    return _build_connection(
+        _slice_rows(rows, cursor, take, skip),
+        len(rows),
+        ConnectionType,
+        EdgeType,
+        NodeType,
+        first,
+        last,
+        attribute_name,
+        selection,
+        columns,
+        nodes,
+    )
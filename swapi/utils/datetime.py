@@ -1,5 +1,26 @@
 import datetime
+from functools import lru_cache
 
 
-def format_datetime(dt: datetime.datetime) -> str:
+# each row has its own timestamps, so this is about twice the number of rows,
+# the UTC offset is part of the key as equal datetimes in different timezones
+# have different local times
+@lru_cache(maxsize=16384)
+def _format(
+    dt: datetime.datetime, utc_offset: datetime.timedelta | None, date_only: bool
+) -> str:
+    if date_only:
+        return dt.date().isoformat()
+
     return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ").replace(".000000Z", "Z")
+
+
+def format_datetime(dt: datetime.datetime) -> str:
+    """Formats `dt` as the reference API does, each distinct value is only
+    formatted once."""
+
+    return _format(dt, dt.utcoffset(), False)
+
+
+def format_date(dt: datetime.datetime) -> str:
+    return _format(dt, dt.utcoffset(), True)
@@ -0,0 +1,15 @@
+import json
+from functools import lru_cache
+
+
+# the lists are short and repeated across rows, so there are few distinct ones
+@lru_cache(maxsize=4096)
+def decode_list(value: str) -> tuple[str, ...]:
+    """Decodes a list column, stored as JSON by `cli import_data`.
+
+    Each distinct value is only parsed once, and the result is shared by all
+    the rows having it, hence the tuple. Values are cached by their content,
+    so re-importing the data doesn't need invalidating anything.
+    """
+
+    return tuple(json.loads(value))
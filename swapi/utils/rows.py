@@ -0,0 +1,126 @@
+import dataclasses
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Collection, Mapping
+
+from strawberry.types.base import get_object_definition
+from strawberry.utils.str_converters import to_camel_case
+
+
+# column name -> function converting the column value to the field value
+Columns = Mapping[str, Callable[[Any], Any] | None]
+
+
+@lru_cache(maxsize=None)
+def _get_field_names(NodeType: type) -> tuple[dict[str, str], frozenset[str]]:
+    """Returns the python names of NodeType's fields by GraphQL name, and the
+    names of its private fields."""
+
+    definition = get_object_definition(NodeType, strict=True)
+    public = {
+        field.graphql_name or to_camel_case(field.python_name): field.python_name
+        for field in definition.fields
+    }
+    private = {field.name for field in dataclasses.fields(NodeType)} - set(
+        public.values()
+    )
+
+    return public, frozenset(private)
+
+
+def get_selected_columns(NodeType: Any, field_names: Collection[str]) -> frozenset[str]:
+    """Returns the columns needed to resolve the GraphQL `field_names` on
+    `NodeType`, based on its `COLUMNS`.
+
+    `id` and the columns backing private fields (like foreign keys) are
+    always included.
+    """
+
+    public, private = _get_field_names(NodeType)
+
+    selected = {public[name] for name in field_names if name in public}
+
+    return frozenset(
+        {"id"}
+        | {
+            column
+            for column in NodeType.COLUMNS
+            if column in selected or column in private
+        }
+    )
+
+
+def get_row_values(
+    row: Any, columns: Columns, selected_columns: Collection[str] | None = None
+) -> dict[str, Any]:
+    """Returns the field values for the `selected_columns` of `row`, ready to
+    be passed to the node type. All the columns are converted when
+    `selected_columns` is `None`.
+    """
+
+    values = {}
+
+    for name, convert in columns.items():
+        if selected_columns is not None and name not in selected_columns:
+            continue
+
+        value = getattr(row, name)
+        values[name] = convert(value) if convert is not None else value
+
+    return values
+
+
+# (node type, row id) -> (node, the columns it was built with or `None` for
+# all of them, the row it was built from), see `get_node_from_row`
+NodeMap = dict[tuple[type, int], tuple[Any, frozenset[str] | None, Any]]
+
+
+def _merge_rows(row: Any, other: Any) -> Any:
+    """Returns `other` with the columns of `row` it doesn't have, as the rows
+    of different queries can be fetched with different projections."""
+
+    missing = vars(row).keys() - vars(other).keys()
+
+    if not missing:
+        return other
+
+    return SimpleNamespace(
+        **vars(other), **{name: getattr(row, name) for name in missing}
+    )
+
+
+def get_node_from_row(
+    nodes: NodeMap | None,
+    NodeType: Any,
+    row: Any,
+    columns: Collection[str] | None = None,
+) -> Any:
+    """Returns `NodeType.from_row(row, columns)`, reusing the node already
+    built for the same row during the request, when there is one in `nodes`.
+
+    A node built with fewer columns is rebuilt with the columns of both,
+    the fields that already got it don't need the new ones.
+    """
+
+    if nodes is None:
+        return NodeType.from_row(row, columns)
+
+    key = (NodeType, row.id)
+    cached = nodes.get(key)
+
+    if cached is not None:
+        node, built_columns, built_row = cached
+
+        if built_columns is None:
+            return node
+
+        if columns is not None and built_columns.issuperset(columns):
+            return node
+
+        columns = built_columns | set(columns) if columns is not None else None
+        row = _merge_rows(built_row, row)
+
+    node = NodeType.from_row(row, columns)
+    nodes[key] = (node, frozenset(columns) if columns is not None else None, row)
+
+    return node
@@ -0,0 +1,33 @@
+from typing import Iterable
+
+from strawberry.types.info import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+
+def _collect_field_names(
+    selections: Iterable[Selection], path: tuple[str, ...], names: set[str]
+) -> None:
+    for selection in selections:
+        if not isinstance(selection, SelectedField):
+            # fragment spreads and inline fragments
+            _collect_field_names(selection.selections, path, names)
+        elif not path:
+            names.add(selection.name)
+        elif selection.name == path[0]:
+            _collect_field_names(selection.selections, path[1:], names)
+
+
+def get_selected_field_names(info: Info, *path: str) -> set[str]:
+    """Returns the names of the fields selected on the field being resolved,
+    including the ones selected through fragments.
+
+    `path` can be used to get the fields selected on a nested field instead,
+    for example `get_selected_field_names(info, "edges", "node")`.
+    """
+
+    names: set[str] = set()
+
+    for field in info.selected_fields:
+        _collect_field_names(field.selections, path, names)
+
+    return names
@@ -0,0 +1,46 @@
+import dataclasses
+import itertools
+from typing import TypeVar
+
+from strawberry.types.base import get_object_definition
+
+
+T = TypeVar("T", bound=type)
+
+
+def add_slots(cls: T) -> T:
+    """Recreates the strawberry type `cls` with `__slots__` for the fields set
+    by its `__init__`, so that its instances have no `__dict__`.
+
+    Strawberry doesn't support `dataclass(slots=True)`, so this does what it
+    does after the type is processed. It should be applied above
+    `@strawberry.type`, and to the base classes too, otherwise the instances
+    still get a `__dict__` from them. Fields with a resolver aren't stored on
+    the instances and keep their class attribute.
+    """
+
+    inherited = set(
+        itertools.chain.from_iterable(
+            getattr(base, "__slots__", ()) for base in cls.__mro__[1:-1]
+        )
+    )
+    slots = tuple(
+        field.name
+        for field in dataclasses.fields(cls)
+        if field.init and field.name not in inherited
+    )
+
+    namespace = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in (*slots, "__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = slots
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted_cls.__qualname__ = cls.__qualname__
+
+    # the schema checks the types of the returned objects against the origin
+    get_object_definition(slotted_cls, strict=True).origin = slotted_cls
+
+    return slotted_cls  # type: ignore
@@ -1,5 +1,4 @@
-import json
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, ClassVar, Collection
 
 import prisma
 
@@ -9,6 +8,9 @@ from .node import Node
 from .page_info import PageInfo
 from .utils.connections import get_connection_resolver
 from .utils.datetime import format_datetime
+from .utils.lists import decode_list
+from .utils.rows import Columns, get_row_values
+from .utils.slots import add_slots
 
 
 if TYPE_CHECKING:
@@ -44,20 +46,21 @@ class VehicleFilmsConnection:
     films: list[Annotated["Film", strawberry.lazy(".film")] | None] | None
 
 
+@add_slots
 @strawberry.type
 class Vehicle(Node):
     id: strawberry.ID
-    name: str | None
-    model: str | None
-    vehicle_class: str | None
-    manufacturers: list[str | None] | None
-    length: float | None
-    cost_in_credits: float | None
-    crew: str | None
-    passengers: str | None
-    max_atmosphering_speed: int | None
-    cargo_capacity: float | None
-    consumables: str | None
+    name: str | None = None
+    model: str | None = None
+    vehicle_class: str | None = None
+    manufacturers: list[str | None] | None = None
+    length: float | None = None
+    cost_in_credits: float | None = None
+    crew: str | None = None
+    passengers: str | None = None
+    max_atmosphering_speed: int | None = None
+    cargo_capacity: float | None = None
+    consumables: str | None = None
     created: str | None = None
     edited: str | None = None
 
@@ -68,9 +71,7 @@ class Vehicle(Node):
             VehiclePilotsEdge,
             "swapi.people.Person",
             attribute_name="pilots",
-            get_additional_filters=lambda root: {
-                "vehicles": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="vehicles",
         )
     )
 
@@ -81,29 +82,33 @@ class Vehicle(Node):
             VehicleFilmsEdge,
             "swapi.film.Film",
             attribute_name="films",
-            get_additional_filters=lambda root: {
-                "vehicles": {"some": {"id": Node.get_id(root)}}
-            },
+            relation="vehicles",
         )
     )
 
+    COLUMNS: ClassVar[Columns] = {
+        "name": None,
+        "model": None,
+        "vehicle_class": None,
+        "manufacturers": decode_list,
+        "length": None,
+        "cost_in_credits": None,
+        "crew": None,
+        "passengers": None,
+        "max_atmosphering_speed": None,
+        "cargo_capacity": None,
+        "consumables": None,
+        "created": format_datetime,
+        "edited": format_datetime,
+    }
+
     @classmethod
-    def from_row(cls, row: prisma.models.Vehicle) -> "Vehicle":
+    def from_row(
+        cls, row: prisma.models.Vehicle, columns: Collection[str] | None = None
+    ) -> "Vehicle":
         return cls(
             id=strawberry.ID(Node.get_global_id("vehicles", row.id)),
-            name=row.name,
-            model=row.model,
-            vehicle_class=row.vehicle_class,
-            manufacturers=json.loads(row.manufacturers),
-            length=row.length,
-            cost_in_credits=row.cost_in_credits,
-            crew=row.crew,
-            passengers=row.passengers,
-            max_atmosphering_speed=row.max_atmosphering_speed,
-            cargo_capacity=row.cargo_capacity,
-            consumables=row.consumables,
-            created=format_datetime(row.created),
-            edited=format_datetime(row.edited),
+            **get_row_values(row, cls.COLUMNS, columns),
         )
 
 